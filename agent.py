@@ -1,113 +1,42 @@
 """Insurance claims processing agent using LangChain."""
 
+import asyncio
+import contextlib
+import functools
+import hashlib
+import json
 import os
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Tuple
 import pandas as pd
-from langchain.agents import create_agent
-from langchain.chat_models import init_chat_model
-from langchain_core.tools import Tool
 import config
-from tools import PolicyLookupTool, RiskScoringTool, TriageLoggerTool
+from tools import (
+    PolicyLookupTool,
+    RiskScoringTool,
+    TriageLoggerTool,
+    add_incident_to_report_days,
+    incident_to_report_days,
+    load_claims_data,
+)
 from logger import ClaimsLogger
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; fall back to the standard library
+    from json import loads as json_loads
 
-class InsuranceClaimsAgent:
-    """Orchestrator agent for processing insurance claims."""
-    
-    def __init__(self, model_name: str = None, temperature: float = None):
-        self.model_name = model_name or config.LLM_MODEL
-        self.temperature = temperature or config.LLM_TEMPERATURE
-        
-        # Initialize tools
-        self.policy_tool = PolicyLookupTool()
-        self.risk_tool = RiskScoringTool()
-        self.triage_tool = TriageLoggerTool()
-        self.logger = ClaimsLogger()
-        
-        # Initialize LLM and agent (LangChain v1 API)
-        # init_chat_model reads OPENAI_API_KEY from env or accepts api_key kwarg
-        self.llm = init_chat_model(
-            f"openai:{self.model_name}",
-            temperature=self.temperature,
-            api_key=config.OPENAI_API_KEY,
-        )
-
-        self.tools = self._create_tools()
-        self.agent = self._create_agent()
-    
-    def _create_tools(self) -> List[Tool]:
-        """Create LangChain tools from our tool classes."""
-        
-        def policy_lookup_wrapper(policy_id: str) -> str:
-            """Look up policy information."""
-            result = self.policy_tool.lookup(policy_id)
-            self.logger.log_tool_call("policy_lookup", {"policy_id": policy_id}, result)
-            return str(result)
-        
-        def risk_scoring_wrapper(params: str) -> str:
-            """
-            Calculate risk score. Expects JSON string with parameters:
-            {"claim_amount": float, "prior_claims": int, "policy_tenure_years": int, 
-             "incident_to_report_days": int, "coverage_limit": float, "claimant_age": int, "location": str}
-            """
-            import json
-            try:
-                params_dict = json.loads(params)
-                result = self.risk_tool.calculate_risk_score(**params_dict)
-                self.logger.log_tool_call("risk_scoring", params_dict, result)
-                return str(result)
-            except Exception as e:
-                return f"Error calculating risk score: {str(e)}"
-        
-        def triage_logger_wrapper(params: str) -> str:
-            """
-            Log triage decision. Expects JSON string with parameters:
-            {"claim_id": str, "severity": str, "action": str, "rationale": str, 
-             "risk_score": float, "policy_info": dict}
-            """
-            import json
-            try:
-                params_dict = json.loads(params)
-                result = self.triage_tool.log_decision(**params_dict)
-                self.logger.log_tool_call("triage_logger", params_dict, result)
-                return str(result)
-            except Exception as e:
-                return f"Error logging decision: {str(e)}"
-        
-        return [
-            Tool(
-                name="policy_lookup",
-                func=policy_lookup_wrapper,
-                description="Look up policy information by policy ID. Input should be a policy ID string like 'POL-1234'."
-            ),
-            Tool(
-                name="risk_scoring",
-                func=risk_scoring_wrapper,
-                description="""Calculate fraud/risk score for a claim. Input should be a JSON string with keys:
-                claim_amount (float), prior_claims (int), policy_tenure_years (int), 
-                incident_to_report_days (int), coverage_limit (float, optional), 
-                claimant_age (int, optional), location (str, optional).
-                Returns risk score (0-1), risk level, and contributing factors."""
-            ),
-            Tool(
-                name="triage_logger",
-                func=triage_logger_wrapper,
-                description="""Log the triage decision for a claim. Input should be a JSON string with keys:
-                claim_id (str), severity (str: low/medium/high/critical), action (str: approve/investigate/deny/escalate),
-                rationale (str), risk_score (float), policy_info (dict).
-                Use this tool to record the final decision."""
-            )
-        ]
-    
-    def _create_agent(self):
-        """Create the LangChain v1 agent with tools."""
 
-        system_message = """You are an expert insurance claims adjuster AI agent working for Zurich Insurance. Your role is to assess insurance claims and make informed decisions about their processing in accordance with Zurich's standards of excellence and customer care.
+# Kept free of per-claim data so every request shares the same cacheable prefix
+SYSTEM_PROMPT = """You are an expert insurance claims adjuster AI agent working for Zurich Insurance. Your role is to assess insurance claims and make informed decisions about their processing in accordance with Zurich's standards of excellence and customer care.
 
 For each claim, you should:
-1. Look up the policy information using the policy_lookup tool
-2. Calculate the risk score using the risk_scoring tool
+1. Look up the policy information using the policy_lookup tool (unless it is already provided)
+2. Calculate the risk score using the risk_scoring tool (unless it is already provided)
 3. Analyze the claim narrative, amount, and all available information
 4. Determine the appropriate severity level (low, medium, high, critical)
 5. Decide on the recommended action (approve, investigate, deny, escalate)
@@ -126,134 +55,784 @@ Action Guidelines:
 - DENY: Claims outside policy coverage or clear fraud indicators
 - ESCALATE: Critical claims or complex cases requiring human expertise
 
+For every claim, your final answer must provide:
+1. Severity level (low/medium/high/critical)
+2. Recommended action (approve/investigate/deny/escalate)
+3. Detailed rationale for your decision
+
 Always provide a detailed rationale explaining your reasoning based on the claim details, policy information, and risk assessment. Maintain Zurich's commitment to fair, efficient, and customer-focused claims processing."""
 
-        # LangChain v1: create_agent returns a Runnable agent loop
-        return create_agent(
-            model=self.llm,
-            tools=self.tools,
-            system_prompt=system_message,
+# Per-claim agent input, formatted from the claim fields plus the prefetched context
+_format_claim_prompt = """
+Process the following insurance claim:
+
+Claim ID: {claim_id}
+Policy ID: {policy_id}
+Claim Type: {claim_type}
+Claim Amount: {claim_amount_fmt}
+Incident Date: {incident_date}
+Report Date: {report_date}
+Days to Report: {incident_to_report_days}
+Location: {location}
+Claimant Age: {claimant_age}
+Prior Claims: {prior_claims}
+Policy Tenure: {policy_tenure_years} years
+
+Claim Narrative:
+{narrative}
+
+Preliminary information already gathered:
+- Policy: {policy_info}
+- Risk: {risk_result}
+""".format_map
+
+# (name, description) for each agent tool; descriptions are sent with every request
+_TOOL_SPECS: Tuple[Tuple[str, str], ...] = (
+    (
+        "policy_lookup",
+        "Look up policy information by policy ID. Input should be a policy ID string like 'POL-1234'."
+    ),
+    (
+        "risk_scoring",
+        """Calculate fraud/risk score for a claim. Input should be a JSON string with keys:
+                claim_amount (float), prior_claims (int), policy_tenure_years (int), 
+                incident_to_report_days (int), coverage_limit (float, optional), 
+                claimant_age (int, optional), location (str, optional).
+                Returns risk score (0-1), risk level, and contributing factors."""
+    ),
+    (
+        "triage_logger",
+        """Log the triage decision for a claim. Input should be a JSON string with keys:
+                claim_id (str), severity (str: low/medium/high/critical), action (str: approve/investigate/deny/escalate),
+                rationale (str), risk_score (float), policy_info (dict).
+                Use this tool to record the final decision."""
+    ),
+)
+
+# Matches the first severity/action label in a single scan of the output.
+# Actions match as word prefixes so "approved"/"escalated" still count.
+_DECISION_RE = re.compile(
+    r"\b(?:(?P<severity>" + "|".join(map(re.escape, config.SEVERITY_LEVELS)) + r")\b"
+    r"|(?P<action>" + "|".join(map(re.escape, config.ACTIONS)) + r"))",
+    re.IGNORECASE
+)
+
+# With early stopping, the streamed answer is re-parsed every this many chunks
+_STREAM_PARSE_EVERY = 32
+
+
+@functools.lru_cache(maxsize=4)
+def get_chat_model(model_name: str, temperature: float, api_key: Optional[str] = None):
+    """
+    Return a chat model shared by every caller with the same settings.
+    
+    Reusing the model instance keeps one OpenAI client, and therefore one
+    pool of keep-alive connections, per (model, temperature) instead of
+    one per agent. Every caller also shares one client-side rate limiter,
+    and calls are bounded by a timeout and a retry budget.
+    """
+    # Imported on first use: LangChain takes most of a second to import, and
+    # rule-only runs never need it
+    from langchain.chat_models import init_chat_model
+    from langchain_core.rate_limiters import InMemoryRateLimiter
+    
+    # init_chat_model reads OPENAI_API_KEY from env or accepts api_key kwarg
+    return init_chat_model(
+        f"openai:{model_name}",
+        temperature=temperature,
+        api_key=api_key,
+        max_retries=config.LLM_MAX_RETRIES,
+        timeout=config.LLM_REQUEST_TIMEOUT,
+        # Keeps parallel and batched calls under the provider's request rate limit
+        rate_limiter=InMemoryRateLimiter(
+            requests_per_second=config.LLM_REQUESTS_PER_SECOND,
+            check_every_n_seconds=0.05,
+            max_bucket_size=config.LLM_MAX_CONCURRENCY
+        ),
+        model_kwargs={"prompt_cache_key": config.PROMPT_CACHE_KEY},
+    )
+
+
+_event_loop = None
+_event_loop_lock = threading.Lock()
+
+
+def event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the process-wide event loop, started in a daemon thread on first use.
+    
+    langchain-openai shares one pooled async HTTP client across every chat
+    model in the process, and its keep-alive connections stay bound to the
+    loop that opened them. Running every coroutine on this one long-lived
+    loop keeps those connections usable; a fresh loop per call would leave
+    them attached to a closed loop and fail the next request.
+    
+    Uses uvloop when it is installed (it is not available on Windows), which
+    schedules the many concurrent LLM calls of a batch with less overhead
+    than the default asyncio loop.
+    """
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None:
+            loop = None
+            if sys.platform != "win32":
+                try:
+                    import uvloop
+                except ImportError:
+                    pass
+                else:
+                    loop = uvloop.new_event_loop()
+            if loop is None:
+                loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="claims-event-loop", daemon=True).start()
+            _event_loop = loop
+        return _event_loop
+
+
+def run_async(coro):
+    """Run a coroutine to completion on the shared event loop and return its result."""
+    loop = event_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_async cannot be called from the shared event loop; await the coroutine instead")
+    
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result()
+    except BaseException:
+        # e.g. KeyboardInterrupt: do not leave the work running on the loop
+        future.cancel()
+        raise
+
+
+# Claim fields a decision depends on; claim_id is deliberately left out
+DECISION_FIELDS = (
+    "policy_id",
+    "claim_type",
+    "claim_amount",
+    "incident_date",
+    "report_date",
+    "location",
+    "claimant_age",
+    "prior_claims",
+    "policy_tenure_years",
+    "narrative",
+)
+
+
+class DecisionCache:
+    """
+    LRU cache of decisions keyed by a fingerprint of the claim's decision fields.
+    
+    Lets repeated evaluation runs, and claims that are identical apart from
+    their id, reuse an earlier LLM decision instead of calling the model again.
+    """
+    
+    def __init__(self, maxsize: int = None, enabled: bool = True):
+        self.maxsize = maxsize or config.DECISION_CACHE_SIZE
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def fingerprint(claim: Dict[str, Any], *variant: Any) -> bytes:
+        """Stable hash of the decision fields (plus any call variant, e.g. flags)."""
+        # str() per value, so numpy and Python scalars of equal value hash alike
+        payload = "\x1f".join(str(claim.get(field)) for field in DECISION_FIELDS + variant)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+    
+    def get(self, claim: Dict[str, Any], *variant: Any) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached decision for claim, relabelled with its id."""
+        if not self.enabled:
+            return None
+        key = self.fingerprint(claim, *variant)
+        with self._lock:
+            decision = self._entries.get(key)
+            if decision is None:
+                return None
+            self._entries.move_to_end(key)
+        return {**decision, "claim_id": claim["claim_id"]}
+    
+    def put(self, claim: Dict[str, Any], decision: Dict[str, Any], *variant: Any):
+        """Remember a successful decision for claim."""
+        if not self.enabled or decision.get("success") is False:
+            return
+        key = self.fingerprint(claim, *variant)
+        with self._lock:
+            self._entries[key] = decision
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Forget every cached decision."""
+        with self._lock:
+            self._entries.clear()
+
+
+# The agent whose process_claim call is running; routes the shared tools back to it
+_active_agent: ContextVar["InsuranceClaimsAgent"] = ContextVar("active_claims_agent")
+
+
+# Tools whose wrappers block on file I/O; the async path runs them in a thread
+_BLOCKING_TOOLS = frozenset({"triage_logger"})
+
+
+def _routed_tool(name: str):
+    """Tool function that forwards to the active agent's wrapper for name."""
+    def call(tool_input: str) -> str:
+        return getattr(_active_agent.get(), f"_{name}_wrapper")(tool_input)
+    return call
+
+
+def _routed_tool_coroutine(name: str):
+    """
+    Async counterpart of _routed_tool, used when the agent runs asynchronously.
+    
+    The agent's tool node gathers every tool call of a model turn at once.
+    In-memory tools answer directly on the event loop instead of each taking
+    a trip through the default thread pool.
+    """
+    call = _routed_tool(name)
+    if name in _BLOCKING_TOOLS:
+        async def acall(tool_input: str) -> str:
+            return await asyncio.to_thread(call, tool_input)
+    else:
+        async def acall(tool_input: str) -> str:
+            return call(tool_input)
+    return acall
+
+
+@functools.lru_cache(maxsize=4)
+def _build_agent(model_name: str, temperature: float, api_key: Optional[str] = None):
+    """
+    Return the compiled agent graph shared by every instance with the same settings.
+    
+    Tools are bound to _routed_tool, so the cached graph still reaches the
+    logger and tools of whichever agent is processing the current claim.
+    """
+    from langchain.agents import create_agent
+    from langchain_core.tools import Tool
+    
+    tools = [
+        Tool(
+            name=name,
+            func=_routed_tool(name),
+            coroutine=_routed_tool_coroutine(name),
+            description=description
         )
+        for name, description in _TOOL_SPECS
+    ]
+    # LangChain v1: create_agent returns a Runnable agent loop
+    return create_agent(
+        model=get_chat_model(model_name, temperature, api_key),
+        tools=tools,
+        system_prompt=SYSTEM_PROMPT
+    )
+
+
+class InsuranceClaimsAgent:
+    """Orchestrator agent for processing insurance claims."""
+    
+    def __init__(self, model_name: str = None, temperature: float = None, use_cache: bool = False):
+        self.model_name = model_name or config.LLM_MODEL
+        self.temperature = temperature or config.LLM_TEMPERATURE
+        # Off outside evaluation: a cache hit reuses another claim's rationale
+        # and skips the triage_logger audit entry
+        self.decision_cache = DecisionCache(enabled=use_cache)
+        
+        # Initialize tools
+        self.policy_tool = PolicyLookupTool()
+        self.risk_tool = RiskScoringTool()
+        self.triage_tool = TriageLoggerTool()
+        self.logger = ClaimsLogger()
+        
+        # Claims frequently share a policy, so memoize lookups per agent
+        self._lookup_policy = functools.lru_cache(maxsize=4096)(self.policy_tool.lookup)
+        
+        # Initialize LLM and agent (LangChain v1 API)
+        self.llm = get_chat_model(self.model_name, self.temperature, config.OPENAI_API_KEY)
+
+        self.agent = self._create_agent()
+    
+    def _policy_lookup_wrapper(self, policy_id: str) -> str:
+        """Look up policy information."""
+        result = self._lookup_policy(policy_id)
+        self.logger.log_tool_call("policy_lookup", {"policy_id": policy_id}, result)
+        return str(result)
+    
+    def _risk_scoring_wrapper(self, params: str) -> str:
+        """
+        Calculate risk score. Expects JSON string with parameters:
+        {"claim_amount": float, "prior_claims": int, "policy_tenure_years": int, 
+         "incident_to_report_days": int, "coverage_limit": float, "claimant_age": int, "location": str}
+        """
+        try:
+            params_dict = json_loads(params)
+            result = self.risk_tool.calculate_risk_score(**params_dict)
+            self.logger.log_tool_call("risk_scoring", params_dict, result)
+            return str(result)
+        except Exception as e:
+            return f"Error calculating risk score: {str(e)}"
     
-    def process_claim(self, claim: Dict[str, Any]) -> Dict[str, Any]:
+    def _triage_logger_wrapper(self, params: str) -> str:
+        """
+        Log triage decision. Expects JSON string with parameters:
+        {"claim_id": str, "severity": str, "action": str, "rationale": str, 
+         "risk_score": float, "policy_info": dict}
+        """
+        try:
+            params_dict = json_loads(params)
+            result = self.triage_tool.log_decision(**params_dict)
+            self.logger.log_tool_call("triage_logger", params_dict, result)
+            return str(result)
+        except Exception as e:
+            return f"Error logging decision: {str(e)}"
+    
+    def _create_agent(self):
+        """Get the shared LangChain v1 agent for this model configuration."""
+        return _build_agent(self.model_name, self.temperature, config.OPENAI_API_KEY)
+    
+    @contextlib.contextmanager
+    def _routing_tools(self):
+        """Route calls from the shared agent's tools to this instance."""
+        token = _active_agent.set(self)
+        try:
+            yield
+        finally:
+            _active_agent.reset(token)
+    
+    def process_claim(
+        self,
+        claim: Dict[str, Any],
+        include_raw_messages: bool = False,
+        early_stop: bool = False
+    ) -> Dict[str, Any]:
         """
         Process a single insurance claim.
         
         Args:
             claim: Dictionary containing claim information
+            include_raw_messages: Also return the full LangChain message list
+                (debugging only; it holds every prompt and completion)
+            early_stop: Stream the answer and stop generating once both a
+                severity and an action have been read; the text received so
+                far is returned as the rationale
             
         Returns:
             Dictionary with decision, severity, action, and rationale
         """
-        # Log the claim processing start
-        self.logger.log_agent_step("claim_received", claim)
+        # Raw messages are a debugging aid, so those calls always run the agent
+        if not include_raw_messages:
+            cached = self._cached_decision(claim, early_stop)
+            if cached is not None:
+                return cached
         
-        # Calculate days between incident and report
-        try:
-            incident_date = datetime.strptime(claim["incident_date"], "%Y-%m-%d")
-            report_date = datetime.strptime(claim["report_date"], "%Y-%m-%d")
-            incident_to_report_days = (report_date - incident_date).days
-        except:
-            incident_to_report_days = 0
-        
-        # Prepare input for agent
-        input_text = f"""
-Process the following insurance claim:
-
-Claim ID: {claim['claim_id']}
-Policy ID: {claim['policy_id']}
-Claim Type: {claim['claim_type']}
-Claim Amount: ${claim['claim_amount']:,.2f}
-Incident Date: {claim['incident_date']}
-Report Date: {claim['report_date']}
-Days to Report: {incident_to_report_days}
-Location: {claim['location']}
-Claimant Age: {claim['claimant_age']}
-Prior Claims: {claim['prior_claims']}
-Policy Tenure: {claim['policy_tenure_years']} years
-
-Claim Narrative:
-{claim['narrative']}
-
-Please assess this claim and provide:
-1. Severity level (low/medium/high/critical)
-2. Recommended action (approve/investigate/deny/escalate)
-3. Detailed rationale for your decision
-
-Use the available tools to gather information and make an informed decision.
-"""
+        input_text = self._prepare_claim(claim)
         
         try:
-            # Run the agent (LangChain v1 expects messages)
-            result = self.agent.invoke({
-                "messages": [
-                    {"role": "user", "content": input_text}
-                ]
-            })
+            with self._routing_tools():
+                if early_stop:
+                    decision = self._build_decision(claim, self._stream_until_decided(input_text), [])
+                else:
+                    # Run the agent (LangChain v1 expects messages)
+                    result = self.agent.invoke({
+                        "messages": [
+                            {"role": "user", "content": input_text}
+                        ]
+                    })
+                    decision = self._build_result(claim, result, include_raw_messages)
             
-            # LangChain v1 create_agent returns a dict with a messages list.
-            # Messages are BaseMessage objects (AIMessage, HumanMessage, etc.)
-            messages = result.get("messages", []) if isinstance(result, dict) else []
-            
-            if messages:
-                # Get the last message (should be AIMessage from the agent)
-                last_msg = messages[-1]
-                # Access content attribute directly (not using .get() since it's an object)
-                output = last_msg.content if hasattr(last_msg, 'content') else str(last_msg)
-            else:
-                output = result.get("output", str(result)) if isinstance(result, dict) else str(result)
-
-            # Extract severity and action from output
-            severity, action = self._parse_decision(output)
+        except Exception as e:
+            return self._build_error_result(claim, e)
+        
+        if not include_raw_messages:
+            self.decision_cache.put(claim, decision, early_stop)
+        return decision
+    
+    async def aprocess_claim(
+        self,
+        claim: Dict[str, Any],
+        include_raw_messages: bool = False,
+        early_stop: bool = False
+    ) -> Dict[str, Any]:
+        """Async variant of process_claim using the agent's ainvoke."""
+        if not include_raw_messages:
+            cached = self._cached_decision(claim, early_stop)
+            if cached is not None:
+                return cached
+        
+        input_text = self._prepare_claim(claim)
+        
+        try:
+            with self._routing_tools():
+                if early_stop:
+                    decision = self._build_decision(claim, await self._astream_until_decided(input_text), [])
+                else:
+                    result = await self.agent.ainvoke({
+                        "messages": [
+                            {"role": "user", "content": input_text}
+                        ]
+                    })
+                    decision = self._build_result(claim, result, include_raw_messages)
             
-            # Log completion
+        except Exception as e:
+            return self._build_error_result(claim, e)
+        
+        if not include_raw_messages:
+            self.decision_cache.put(claim, decision, early_stop)
+        return decision
+    
+    def _cached_decision(self, claim: Dict[str, Any], early_stop: bool) -> Optional[Dict[str, Any]]:
+        """Return and log a cached decision for an identical earlier claim, if any."""
+        decision = self.decision_cache.get(claim, early_stop)
+        if decision is not None:
             self.logger.log_agent_step("claim_processed", {
                 "claim_id": claim["claim_id"],
-                "severity": severity,
-                "action": action,
-                "steps": len(messages)
+                "severity": decision["severity"],
+                "action": decision["action"],
+                "steps": 0,
+                "cached": True
             })
+        return decision
+    
+    @staticmethod
+    def prepare_batch(claims_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Precompute per-claim fields for batch processing.
+        
+        Parses the incident/report date columns once for the whole frame so
+        process_claim reads incident_to_report_days instead of re-parsing
+        dates for every claim, and formats the claim amounts for the prompt.
+        """
+        claims_df = add_incident_to_report_days(claims_df)
+        claims_df["claim_amount_fmt"] = claims_df["claim_amount"].map("${:,.2f}".format)
+        return claims_df
+    
+    def process_claims_batch(
+        self,
+        claims: List[Dict[str, Any]],
+        max_concurrency: int = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Process several claims concurrently.
+        
+        The workload is bound by LLM round-trips, so claims are fanned out
+        over the agent's async API instead of being invoked one at a time.
+        
+        Args:
+            claims: List of claim dictionaries
+            max_concurrency: Maximum number of claims in flight at once
             
-            return {
-                "claim_id": claim["claim_id"],
-                "severity": severity,
-                "action": action,
-                "rationale": output,
-                # In v1, tool calls are embedded in the returned messages.
-                "intermediate_steps": messages,
-                "success": True
-            }
-            
-        except Exception as e:
-            self.logger.log_agent_step("claim_error", {
-                "claim_id": claim["claim_id"],
-                "error": str(e)
-            })
+        Returns:
+            List of decision dictionaries, in the same order as claims
+        """
+        return run_async(self.aprocess_claims_batch(claims, max_concurrency))
+    
+    async def aprocess_claims_batch(
+        self,
+        claims: List[Dict[str, Any]],
+        max_concurrency: int = None
+    ) -> List[Dict[str, Any]]:
+        """Async variant of process_claims_batch."""
+        semaphore = asyncio.Semaphore(max_concurrency or config.AGENT_MAX_CONCURRENCY)
+        
+        async def bounded(claim: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.aprocess_claim(claim)
+        
+        return list(await asyncio.gather(*(bounded(claim) for claim in claims)))
+    
+    def submit_batch(
+        self,
+        claims: List[Dict[str, Any]],
+        poll_interval: float = 30.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Score claims offline through the OpenAI Batch API.
+        
+        Batch requests cannot call tools mid-generation; they rely on the
+        policy lookup and risk score that _prepare_claim inlines into every
+        prompt. Blocks until the batch reaches a terminal state.
+        
+        Args:
+            claims: List of claim dictionaries
+            poll_interval: Seconds to wait between batch status checks
             
-            return {
-                "claim_id": claim["claim_id"],
-                "severity": "unknown",
-                "action": "escalate",
-                "rationale": f"Error processing claim: {str(e)}",
-                "success": False
+        Returns:
+            List of decision dictionaries, in the same order as claims
+        """
+        from openai import OpenAI
+        
+        client = OpenAI(api_key=config.OPENAI_API_KEY)
+        
+        lines = []
+        for claim in claims:
+            lines.append(json.dumps({
+                "custom_id": str(claim["claim_id"]),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model_name,
+                    "temperature": self.temperature,
+                    "prompt_cache_key": config.PROMPT_CACHE_KEY,
+                    "messages": [
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": self._prepare_claim(claim)}
+                    ]
+                }
+            }))
+        
+        batch_file = client.files.create(
+            file=("claims_batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        self.logger.log_agent_step("batch_submitted", {
+            "batch_id": batch.id,
+            "num_claims": len(claims)
+        })
+        
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch.id)
+        
+        outputs = {}
+        if batch.output_file_id:
+            for line in client.files.content(batch.output_file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                record = json_loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") == 200:
+                    outputs[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+        
+        results = []
+        for claim in claims:
+            output = outputs.get(str(claim["claim_id"]))
+            if output is None:
+                results.append(self._build_error_result(
+                    claim, RuntimeError(f"No batch output (batch status: {batch.status})")
+                ))
+            else:
+                results.append(self._build_decision(claim, output, []))
+        
+        return results
+    
+    def _prepare_claim(self, claim: Dict[str, Any]) -> str:
+        """Log the incoming claim and build the agent input text."""
+        # Log the claim processing start
+        self.logger.log_agent_step("claim_received", claim)
+        
+        # The agent almost always starts with policy_lookup and risk_scoring,
+        # so run both locally and inline the results instead of paying an
+        # LLM round-trip for each tool call
+        days_to_report = incident_to_report_days(claim)
+        policy_info, risk_result = self._gather_claim_context(claim, days_to_report)
+        
+        return self._build_prompt(claim, days_to_report, policy_info, risk_result)
+    
+    def _gather_claim_context(
+        self,
+        claim: Dict[str, Any],
+        incident_to_report_days: int
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Run the policy lookup and risk scoring tools locally for a claim."""
+        policy_info = self._lookup_policy(claim["policy_id"])
+        self.logger.log_tool_call("policy_lookup", {"policy_id": claim["policy_id"]}, policy_info)
+        
+        risk_params = {
+            "claim_amount": claim["claim_amount"],
+            "prior_claims": claim["prior_claims"],
+            "policy_tenure_years": claim["policy_tenure_years"],
+            "incident_to_report_days": incident_to_report_days,
+            "coverage_limit": policy_info.get("coverage_limit"),
+            "claimant_age": claim["claimant_age"],
+            "location": claim["location"]
+        }
+        risk_result = self.risk_tool.calculate_risk_score(**risk_params)
+        self.logger.log_tool_call("risk_scoring", risk_params, risk_result)
+        
+        return policy_info, risk_result
+    
+    def _build_prompt(
+        self,
+        claim: Dict[str, Any],
+        incident_to_report_days: int,
+        policy_info: Dict[str, Any],
+        risk_result: Dict[str, Any]
+    ) -> str:
+        """Build the agent input text for a claim."""
+        amount_fmt = claim.get("claim_amount_fmt")
+        if amount_fmt is None:
+            amount_fmt = f"${claim['claim_amount']:,.2f}"
+        return _format_claim_prompt({
+            **claim,
+            "claim_amount_fmt": amount_fmt,
+            "incident_to_report_days": incident_to_report_days,
+            "policy_info": policy_info,
+            "risk_result": risk_result,
+        })
+    
+    def _stream_until_decided(self, input_text: str) -> str:
+        """Stream the agent's answer, stopping once severity and action are known."""
+        stream = self.agent.stream(
+            {"messages": [{"role": "user", "content": input_text}]},
+            stream_mode="messages"
+        )
+        parts = []
+        message_id = None
+        # Closing the stream early cancels the rest of the generation
+        with contextlib.closing(stream):
+            for chunk, metadata in stream:
+                if self._collect_chunk(parts, chunk, metadata, message_id):
+                    message_id = chunk.id
+                    if len(parts) % _STREAM_PARSE_EVERY == 0 and self._is_decided(parts):
+                        break
+        return "".join(parts)
+    
+    async def _astream_until_decided(self, input_text: str) -> str:
+        """Async variant of _stream_until_decided."""
+        stream = self.agent.astream(
+            {"messages": [{"role": "user", "content": input_text}]},
+            stream_mode="messages"
+        )
+        parts = []
+        message_id = None
+        async with contextlib.aclosing(stream):
+            async for chunk, metadata in stream:
+                if self._collect_chunk(parts, chunk, metadata, message_id):
+                    message_id = chunk.id
+                    if len(parts) % _STREAM_PARSE_EVERY == 0 and self._is_decided(parts):
+                        break
+        return "".join(parts)
+    
+    @staticmethod
+    def _collect_chunk(parts: List[str], chunk: Any, metadata: Dict[str, Any], message_id: Optional[str]) -> bool:
+        """Append a streamed model text chunk to parts; returns False for other chunks."""
+        if metadata.get("langgraph_node") != "model" or not isinstance(chunk.content, str):
+            return False
+        # Tool-call chunks carry no answer text
+        if not chunk.content or getattr(chunk, "tool_call_chunks", None):
+            return False
+        # A new model message (e.g. after a tool call) starts a new answer
+        if chunk.id != message_id:
+            parts.clear()
+        parts.append(chunk.content)
+        return True
+    
+    def _is_decided(self, parts: List[str]) -> bool:
+        """Check whether the streamed text already names a severity and an action."""
+        # Leave out the trailing word, which may still be incomplete
+        words = "".join(parts).rsplit(None, 1)
+        text = words[0] if len(words) > 1 else ""
+        return all(self._find_decision(text))
+    
+    def _build_result(
+        self,
+        claim: Dict[str, Any],
+        result: Any,
+        include_raw_messages: bool = False
+    ) -> Dict[str, Any]:
+        """Turn the raw agent output into a decision dictionary."""
+        # LangChain v1 create_agent returns a dict with a messages list.
+        # Messages are BaseMessage objects (AIMessage, HumanMessage, etc.)
+        messages = result.get("messages", []) if isinstance(result, dict) else []
+        
+        if messages:
+            # Get the last message (should be AIMessage from the agent)
+            last_msg = messages[-1]
+            # Access content attribute directly (not using .get() since it's an object)
+            output = last_msg.content if hasattr(last_msg, 'content') else str(last_msg)
+        else:
+            output = result.get("output", str(result)) if isinstance(result, dict) else str(result)
+
+        return self._build_decision(claim, output, messages, include_raw_messages)
+    
+    def _build_decision(
+        self,
+        claim: Dict[str, Any],
+        output: str,
+        messages: List[Any],
+        include_raw_messages: bool = False
+    ) -> Dict[str, Any]:
+        """Parse the final agent output and log the processed claim."""
+        # Extract severity and action from output
+        severity, action = self._parse_decision(output)
+        
+        # Log completion
+        self.logger.log_agent_step("claim_processed", {
+            "claim_id": claim["claim_id"],
+            "severity": severity,
+            "action": action,
+            "steps": len(messages)
+        })
+        
+        decision = {
+            "claim_id": claim["claim_id"],
+            "severity": severity,
+            "action": action,
+            "rationale": output,
+            "steps_summary": self._summarize_steps(messages),
+            "success": True
+        }
+        if include_raw_messages:
+            # In v1, tool calls are embedded in the returned messages.
+            decision["intermediate_steps"] = messages
+        return decision
+    
+    @staticmethod
+    def _summarize_steps(messages: List[Any]) -> List[Dict[str, Any]]:
+        """Keep only message types, tool calls and token counts."""
+        return [
+            {
+                "type": type(m).__name__,
+                "tool_calls": getattr(m, "tool_calls", None),
+                "tokens": (getattr(m, "usage_metadata", None) or {}).get("total_tokens")
             }
+            for m in messages
+        ]
+    
+    def _build_error_result(self, claim: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """Log a processing failure and return the fallback decision."""
+        self.logger.log_agent_step("claim_error", {
+            "claim_id": claim["claim_id"],
+            "error": str(error)
+        })
+        
+        return {
+            "claim_id": claim["claim_id"],
+            "severity": "unknown",
+            "action": "escalate",
+            "rationale": f"Error processing claim: {str(error)}",
+            "success": False
+        }
     
     def _parse_decision(self, output: str) -> tuple:
         """Parse severity and action from agent output."""
-        output_lower = output.lower()
-        
-        # Extract severity
-        severity = "medium"  # default
-        for sev in config.SEVERITY_LEVELS:
-            if sev in output_lower:
-                severity = sev
-                break
+        severity, action = self._find_decision(output)
+        return severity or "medium", action or "investigate"
+    
+    def _find_decision(self, output: str) -> tuple:
+        """Return the first severity and action labels in output, or None for each."""
+        severity = None
+        action = None
         
-        # Extract action
-        action = "investigate"  # default
-        for act in config.ACTIONS:
-            if act in output_lower:
-                action = act
+        # One pass over the output, keeping the first label of each kind
+        for match in _DECISION_RE.finditer(output):
+            if severity is None and match.group("severity"):
+                severity = match.group("severity").lower()
+            elif action is None and match.group("action"):
+                action = match.group("action").lower()
+            if severity and action:
                 break
         
         return severity, action
@@ -262,7 +841,7 @@ Use the available tools to gather information and make an informed decision.
 def test_agent():
     """Test the agent with a sample claim."""
     # Load a sample claim
-    claims_df = pd.read_csv(config.CLAIMS_DATA_PATH)
+    claims_df = InsuranceClaimsAgent.prepare_batch(load_claims_data())
     sample_claim = claims_df.iloc[0].to_dict()
     
     print("Testing Insurance Claims Agent")
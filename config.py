@@ -23,15 +23,28 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
 LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.1"))
+PROMPT_CACHE_KEY = "zurich-claims-agent-v1"  # Routes requests sharing the system prompt to the same cache
+LLM_REQUESTS_PER_SECOND = float(os.getenv("LLM_REQUESTS_PER_SECOND", "8"))  # Client-side rate limit
+LLM_MAX_CONCURRENCY = 16  # Prompts in flight for batched LLM calls
+LLM_MAX_RETRIES = 2
+LLM_REQUEST_TIMEOUT = 30  # Seconds; bounds tail latency of a single call
 
 # Data Configuration
 CLAIMS_DATA_PATH = DATA_DIR / "claims_data.csv"
 POLICIES_DATA_PATH = DATA_DIR / "policies_data.csv"
-DECISIONS_LOG_PATH = DATA_DIR / "decisions_log.json"
+DECISIONS_LOG_PATH = DATA_DIR / "decisions_log.jsonl"
+LEGACY_DECISIONS_LOG_PATH = DATA_DIR / "decisions_log.json"  # JSON array; converted on first use
 
 # Agent Configuration
 MAX_ITERATIONS = 5
 AGENT_VERBOSE = True
+AGENT_MAX_CONCURRENCY = 16  # Claims in flight for batch processing
+DECISION_CACHE_SIZE = 2048  # LLM decisions remembered per system for identical claims
+
+# Evaluation Configuration
+EVAL_MAX_CONCURRENCY = 10  # Claims (or claim batches) evaluated concurrently per system
+LLM_BATCH_SIZE = 8  # Claims marshaled into one prompt by the one-shot LLM baseline
+RULE_PARALLEL_MIN_CLAIMS = 100_000  # Rule-based runs this large are split across processes
 
 # Risk Thresholds
 RISK_THRESHOLD_HIGH = 0.7
@@ -1,16 +1,83 @@
 """Generate synthetic insurance claims data with narratives."""
 
+import math
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import random
-from typing import List, Dict
+from datetime import datetime, timedelta
+from typing import List, Dict, Tuple
 import config
+from tools import CLAIMS_DTYPES
 
 # Set random seed for reproducibility
 np.random.seed(42)
 random.seed(42)
 
+# (min, max, log-normal mu) claim amount parameters per claim type
+_AMOUNT_PARAMS = {
+    claim_type: (min_amt, max_amt, math.log((min_amt + max_amt) / 2))
+    for claim_type, (min_amt, max_amt) in {
+        "Auto Accident": (2000, 50000),
+        "Property Damage": (1000, 100000),
+        "Theft": (500, 25000),
+        "Fire Damage": (5000, 200000),
+        "Water Damage": (2000, 75000),
+        "Liability": (3000, 150000),
+        "Medical": (1000, 100000),
+        "Storm Damage": (2000, 100000)
+    }.items()
+}
+
+# Narrative skeletons per claim type, filled in with str.format
+_NARRATIVE_TEMPLATES: Dict[str, Tuple[str, ...]] = {
+    "Auto Accident": (
+        "Vehicle collision occurred at intersection. Claimant reports being rear-ended at stoplight. Damage to rear bumper and trunk. Estimated repair cost ${amount:,.2f}.",
+        "Multi-vehicle accident on highway. Claimant's vehicle sustained front-end damage. Police report filed. Total damages approximately ${amount:,.2f}.",
+        "Single-vehicle accident. Claimant lost control on wet road and hit guardrail. Airbags deployed. Repair estimate ${amount:,.2f}."
+    ),
+    "Property Damage": (
+        "Storm damage to residential property. Roof tiles damaged and water intrusion into attic. Assessment estimates repairs at ${amount:,.2f}.",
+        "Tree fell on house during windstorm. Damage to roof and gutters. Emergency repairs needed. Estimated cost ${amount:,.2f}.",
+        "Neighbor's property damage caused structural issues. Wall and foundation affected. Repair quote ${amount:,.2f}."
+    ),
+    "Theft": (
+        "Burglary reported at residence. Electronics and jewelry stolen. Police report filed. Total loss valued at ${amount:,.2f}.",
+        "Vehicle theft from parking garage. Car recovered but damaged. Repair and replacement costs ${amount:,.2f}.",
+        "Break-in at property. Multiple items stolen including appliances. Police investigation ongoing. Loss estimate ${amount:,.2f}."
+    ),
+    "Fire Damage": (
+        "Kitchen fire caused by electrical malfunction. Smoke and fire damage to kitchen and adjacent rooms. Restoration cost ${amount:,.2f}.",
+        "Wildfire smoke damage to property. Interior and exterior cleaning needed. Total cost ${amount:,.2f}.",
+        "Electrical fire in garage. Structure damage and vehicle damaged. Fire department report available. Estimate ${amount:,.2f}."
+    ),
+    "Water Damage": (
+        "Pipe burst in basement. Flooding damaged flooring, walls, and personal property. Water remediation needed. Cost ${amount:,.2f}.",
+        "Roof leak during heavy rain. Water damage to ceiling and walls in multiple rooms. Repairs estimated at ${amount:,.2f}.",
+        "Washing machine overflow caused water damage. Flooring and drywall replacement needed. Total ${amount:,.2f}."
+    ),
+    "Liability": (
+        "Guest injured on property. Medical treatment required. Liability claim filed. Settlement amount ${amount:,.2f}.",
+        "Property damage caused by claimant to third party. Legal settlement reached. Total liability ${amount:,.2f}.",
+        "Dog bite incident. Medical bills and legal costs. Total claim amount ${amount:,.2f}."
+    ),
+    "Medical": (
+        "Emergency room visit after accident. Treatment for injuries including X-rays and medication. Total medical bills ${amount:,.2f}.",
+        "Surgery required after covered incident. Hospital stay and rehabilitation. Medical costs ${amount:,.2f}.",
+        "Physical therapy and specialist visits following injury. Ongoing treatment. Total expenses ${amount:,.2f}."
+    ),
+    "Storm Damage": (
+        "Hail damage to roof and siding. Multiple dents and broken shingles. Contractor estimate ${amount:,.2f}.",
+        "Hurricane damage to property. Wind and water damage. Emergency repairs and restoration. Cost ${amount:,.2f}.",
+        "Tornado damage. Structural issues and debris removal needed. Assessment total ${amount:,.2f}."
+    )
+}
+_DEFAULT_NARRATIVE_TEMPLATES = ("Claim filed for {claim_type}. Total amount ${amount:,.2f}.",)
+
+# Ground truth severity bands: < 5k low, < 25k medium, < 75k high, else critical
+_SEVERITY_BOUNDS = np.array([5000, 25000, 75000])
+_SEVERITY_LABELS = np.array(["low", "medium", "high", "critical"])
+
 
 class ClaimsDataGenerator:
     """Generate synthetic insurance claims data."""
@@ -37,38 +104,41 @@ class ClaimsDataGenerator:
         "New York, NY", "Chicago, IL", "Toronto, Canada"
     ]
     
+    # Rows of (min, max, mu) aligned with CLAIM_TYPES for vectorized lookups
+    _AMOUNT_TABLE = np.array(list(map(_AMOUNT_PARAMS.get, CLAIM_TYPES)))
+    
     def __init__(self, num_claims: int = 200):
         self.num_claims = num_claims
         
     def generate_claims(self) -> pd.DataFrame:
         """Generate claims dataset with metadata."""
-        claims = []
+        n = self.num_claims
         
-        for i in range(self.num_claims):
-            claim_type = random.choice(self.CLAIM_TYPES)
-            claim_amount = self._generate_claim_amount(claim_type)
-            
-            claim = {
-                "claim_id": f"CLM-{i+1:05d}",
-                "policy_id": f"POL-{random.randint(1000, 9999)}",
-                "claim_type": claim_type,
-                "claim_amount": claim_amount,
-                "incident_date": self._generate_date(),
-                "report_date": self._generate_date(offset=1, days_range=30),
-                "location": random.choice(self.LOCATIONS),
-                "claimant_age": random.randint(18, 85),
-                "prior_claims": random.randint(0, 5),
-                "policy_tenure_years": random.randint(0, 20),
-                "narrative": self._generate_narrative(claim_type, claim_amount),
-                "ground_truth_severity": self._assign_ground_truth_severity(claim_amount),
-                "ground_truth_action": None  # Will be assigned based on severity
-            }
-            
-            # Assign ground truth action based on severity and other factors
-            claim["ground_truth_action"] = self._assign_ground_truth_action(claim)
-            claims.append(claim)
+        # Draw every column in one vectorized call instead of looping per claim
+        type_idx = np.random.randint(0, len(self.CLAIM_TYPES), size=n)
+        claim_types = np.array(self.CLAIM_TYPES)[type_idx]
+        claim_amounts = self._generate_claim_amounts(type_idx)
         
-        return pd.DataFrame(claims)
+        claims_df = pd.DataFrame({
+            "claim_id": np.char.add("CLM-", np.char.zfill(np.arange(1, n + 1).astype(str), 5)),
+            "policy_id": np.char.add("POL-", np.random.randint(1000, 10000, size=n).astype(str)),
+            "claim_type": claim_types,
+            "claim_amount": claim_amounts,
+            "incident_date": self._generate_dates(n),
+            "report_date": self._generate_dates(n, offset=1, days_range=30),
+            "location": np.array(self.LOCATIONS)[np.random.randint(0, len(self.LOCATIONS), size=n)],
+            "claimant_age": np.random.randint(18, 86, size=n),
+            "prior_claims": np.random.randint(0, 6, size=n),
+            "policy_tenure_years": np.random.randint(0, 21, size=n),
+        })
+        
+        claims_df["narrative"] = self._generate_narratives(claim_types, claim_amounts)
+        claims_df["ground_truth_severity"] = self._assign_ground_truth_severities(claim_amounts)
+        
+        # Assign ground truth action based on severity and other factors
+        claims_df["ground_truth_action"] = self._assign_ground_truth_actions(claims_df)
+        
+        return claims_df
     
     def generate_policies(self, claims_df: pd.DataFrame) -> pd.DataFrame:
         """Generate policy data for the claims."""
@@ -90,122 +160,88 @@ class ClaimsDataGenerator:
         
         return pd.DataFrame(policies)
     
-    def _generate_claim_amount(self, claim_type: str) -> float:
-        """Generate realistic claim amounts based on type."""
-        base_amounts = {
-            "Auto Accident": (2000, 50000),
-            "Property Damage": (1000, 100000),
-            "Theft": (500, 25000),
-            "Fire Damage": (5000, 200000),
-            "Water Damage": (2000, 75000),
-            "Liability": (3000, 150000),
-            "Medical": (1000, 100000),
-            "Storm Damage": (2000, 100000)
-        }
-        
-        min_amt, max_amt = base_amounts.get(claim_type, (1000, 50000))
+    def _generate_claim_amounts(self, type_idx: np.ndarray) -> np.ndarray:
+        """Generate realistic claim amounts based on type (indices into CLAIM_TYPES)."""
+        min_amt, max_amt, mu = np.take(self._AMOUNT_TABLE, type_idx, axis=0).T
         
         # Use log-normal distribution for realistic amounts
-        mu = np.log((min_amt + max_amt) / 2)
         sigma = 0.5
-        amount = np.random.lognormal(mu, sigma)
+        amounts = np.random.lognormal(mu, sigma)
         
         # Clip to reasonable range
-        return round(max(min_amt, min(max_amt, amount)), 2)
+        return np.round(np.clip(amounts, min_amt, max_amt), 2)
     
     def _generate_date(self, offset: int = -365, days_range: int = 365) -> str:
         """Generate a random date."""
-        from datetime import datetime, timedelta
-        
         base_date = datetime.now() + timedelta(days=offset)
         random_days = random.randint(0, days_range)
         date = base_date + timedelta(days=random_days)
         
         return date.strftime("%Y-%m-%d")
     
+    def _generate_dates(self, n: int, offset: int = -365, days_range: int = 365) -> np.ndarray:
+        """Generate n random dates as YYYY-MM-DD strings."""
+        base_date = np.datetime64(datetime.now().date()) + np.timedelta64(offset, "D")
+        random_days = np.random.randint(0, days_range + 1, size=n).astype("timedelta64[D]")
+        
+        return (base_date + random_days).astype(str)
+    
     def _generate_narrative(self, claim_type: str, amount: float) -> str:
         """Generate claim narrative text."""
-        narratives = {
-            "Auto Accident": [
-                f"Vehicle collision occurred at intersection. Claimant reports being rear-ended at stoplight. Damage to rear bumper and trunk. Estimated repair cost ${amount:,.2f}.",
-                f"Multi-vehicle accident on highway. Claimant's vehicle sustained front-end damage. Police report filed. Total damages approximately ${amount:,.2f}.",
-                f"Single-vehicle accident. Claimant lost control on wet road and hit guardrail. Airbags deployed. Repair estimate ${amount:,.2f}."
-            ],
-            "Property Damage": [
-                f"Storm damage to residential property. Roof tiles damaged and water intrusion into attic. Assessment estimates repairs at ${amount:,.2f}.",
-                f"Tree fell on house during windstorm. Damage to roof and gutters. Emergency repairs needed. Estimated cost ${amount:,.2f}.",
-                f"Neighbor's property damage caused structural issues. Wall and foundation affected. Repair quote ${amount:,.2f}."
-            ],
-            "Theft": [
-                f"Burglary reported at residence. Electronics and jewelry stolen. Police report filed. Total loss valued at ${amount:,.2f}.",
-                f"Vehicle theft from parking garage. Car recovered but damaged. Repair and replacement costs ${amount:,.2f}.",
-                f"Break-in at property. Multiple items stolen including appliances. Police investigation ongoing. Loss estimate ${amount:,.2f}."
-            ],
-            "Fire Damage": [
-                f"Kitchen fire caused by electrical malfunction. Smoke and fire damage to kitchen and adjacent rooms. Restoration cost ${amount:,.2f}.",
-                f"Wildfire smoke damage to property. Interior and exterior cleaning needed. Total cost ${amount:,.2f}.",
-                f"Electrical fire in garage. Structure damage and vehicle damaged. Fire department report available. Estimate ${amount:,.2f}."
-            ],
-            "Water Damage": [
-                f"Pipe burst in basement. Flooding damaged flooring, walls, and personal property. Water remediation needed. Cost ${amount:,.2f}.",
-                f"Roof leak during heavy rain. Water damage to ceiling and walls in multiple rooms. Repairs estimated at ${amount:,.2f}.",
-                f"Washing machine overflow caused water damage. Flooring and drywall replacement needed. Total ${amount:,.2f}."
-            ],
-            "Liability": [
-                f"Guest injured on property. Medical treatment required. Liability claim filed. Settlement amount ${amount:,.2f}.",
-                f"Property damage caused by claimant to third party. Legal settlement reached. Total liability ${amount:,.2f}.",
-                f"Dog bite incident. Medical bills and legal costs. Total claim amount ${amount:,.2f}."
-            ],
-            "Medical": [
-                f"Emergency room visit after accident. Treatment for injuries including X-rays and medication. Total medical bills ${amount:,.2f}.",
-                f"Surgery required after covered incident. Hospital stay and rehabilitation. Medical costs ${amount:,.2f}.",
-                f"Physical therapy and specialist visits following injury. Ongoing treatment. Total expenses ${amount:,.2f}."
-            ],
-            "Storm Damage": [
-                f"Hail damage to roof and siding. Multiple dents and broken shingles. Contractor estimate ${amount:,.2f}.",
-                f"Hurricane damage to property. Wind and water damage. Emergency repairs and restoration. Cost ${amount:,.2f}.",
-                f"Tornado damage. Structural issues and debris removal needed. Assessment total ${amount:,.2f}."
-            ]
-        }
-        
-        templates = narratives.get(claim_type, [f"Claim filed for {claim_type}. Total amount ${amount:,.2f}."])
-        return random.choice(templates)
+        templates = _NARRATIVE_TEMPLATES.get(claim_type, _DEFAULT_NARRATIVE_TEMPLATES)
+        return random.choice(templates).format(claim_type=claim_type, amount=amount)
+    
+    def _generate_narratives(self, claim_types: np.ndarray, amounts: np.ndarray) -> List[str]:
+        """Generate narrative text for every claim, picking all templates in one draw."""
+        picks = np.random.randint(0, 3, size=len(claim_types))
+        narratives = []
+        for claim_type, amount, pick in zip(claim_types, amounts, picks):
+            templates = _NARRATIVE_TEMPLATES.get(claim_type, _DEFAULT_NARRATIVE_TEMPLATES)
+            narratives.append(templates[pick % len(templates)].format(claim_type=claim_type, amount=amount))
+        return narratives
     
     def _assign_ground_truth_severity(self, amount: float) -> str:
         """Assign severity level based on amount and other factors."""
-        if amount < 5000:
-            return "low"
-        elif amount < 25000:
-            return "medium"
-        elif amount < 75000:
-            return "high"
-        else:
-            return "critical"
-    
-    def _assign_ground_truth_action(self, claim: Dict) -> str:
-        """Assign ground truth action based on claim characteristics."""
-        severity = claim["ground_truth_severity"]
-        prior_claims = claim["prior_claims"]
-        tenure = claim["policy_tenure_years"]
+        return str(self._assign_ground_truth_severities(np.array([amount]))[0])
+    
+    def _assign_ground_truth_severities(self, amounts: np.ndarray) -> np.ndarray:
+        """Assign severity levels for an array of amounts in one pass."""
+        return _SEVERITY_LABELS[np.searchsorted(_SEVERITY_BOUNDS, amounts, side="right")]
+    
+    def _assign_ground_truth_actions(self, claims_df: pd.DataFrame) -> np.ndarray:
+        """Assign ground truth actions based on claim characteristics."""
+        severity = claims_df["ground_truth_severity"].to_numpy()
+        prior_claims = claims_df["prior_claims"].to_numpy()
+        tenure = claims_df["policy_tenure_years"].to_numpy()
         
-        # Simple rule-based ground truth
-        if severity == "low" and prior_claims < 2:
-            return "approve"
-        elif severity == "medium" and prior_claims < 3 and tenure > 1:
-            return "approve"
-        elif severity == "high" or prior_claims >= 3:
-            return "investigate"
-        elif severity == "critical" or prior_claims >= 4:
-            return "escalate"
-        else:
-            return "investigate"
+        # Simple rule-based ground truth, first matching rule wins
+        conditions = [
+            (severity == "low") & (prior_claims < 2),
+            (severity == "medium") & (prior_claims < 3) & (tenure > 1),
+            (severity == "high") | (prior_claims >= 3),
+            (severity == "critical") | (prior_claims >= 4),
+        ]
+        choices = ["approve", "approve", "investigate", "escalate"]
+        
+        return np.select(conditions, choices, default="investigate")
     
     def save_data(self, claims_df: pd.DataFrame, policies_df: pd.DataFrame):
-        """Save generated data to CSV files."""
+        """Save generated data to CSV files, plus Parquet copies of both tables."""
         claims_df.to_csv(config.CLAIMS_DATA_PATH, index=False)
         policies_df.to_csv(config.POLICIES_DATA_PATH, index=False)
         print(f"✓ Saved {len(claims_df)} claims to {config.CLAIMS_DATA_PATH}")
         print(f"✓ Saved {len(policies_df)} policies to {config.POLICIES_DATA_PATH}")
+        
+        # Parquet reloads much faster than CSV for the app and the evaluation
+        # harness; written after the CSVs so the copies count as fresh
+        claims_parquet_path = config.CLAIMS_DATA_PATH.with_suffix(".parquet")
+        policies_parquet_path = config.POLICIES_DATA_PATH.with_suffix(".parquet")
+        try:
+            claims_df.astype(CLAIMS_DTYPES).to_parquet(claims_parquet_path, index=False, compression="zstd")
+            policies_df.to_parquet(policies_parquet_path, index=False, compression="zstd")
+            print(f"✓ Saved Parquet copies to {claims_parquet_path} and {policies_parquet_path}")
+        except ImportError:
+            pass
 
 
 def main():
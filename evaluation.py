@@ -1,43 +1,62 @@
 """Evaluation system comparing different approaches to claims processing."""
 
+import argparse
+import asyncio
+import functools
+import os
+import queue
+import re
+import time
+from dataclasses import asdict, dataclass
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional
 from datetime import datetime
 import json
-from sklearn.metrics import accuracy_score, precision_recall_fscore_support, confusion_matrix
+from concurrent.futures import ProcessPoolExecutor
 import config
-from agent import InsuranceClaimsAgent
-from tools import PolicyLookupTool, RiskScoringTool
-from langchain_openai import ChatOpenAI
+from agent import DecisionCache, InsuranceClaimsAgent, event_loop, get_chat_model, run_async
+from tools import (
+    PolicyLookupTool,
+    RiskScoringTool,
+    add_incident_to_report_days,
+    incident_to_report_days,
+    load_claims_data,
+)
 from logger import ClaimsLogger
 
 
+@dataclass(slots=True)
+class Prediction:
+    """A system's decision for one evaluation claim, alongside the ground truth."""
+    claim_id: str
+    predicted_severity: str
+    predicted_action: str
+    true_severity: str
+    true_action: str
+    processing_time: float
+
+
 class RuleBasedSystem:
     """Baseline rule-based claims processing system."""
     
     def __init__(self):
         self.policy_tool = PolicyLookupTool()
         self.risk_tool = RiskScoringTool()
+        # Claims frequently share a policy, so memoize lookups per instance
+        self._lookup_policy = functools.lru_cache(maxsize=4096)(self.policy_tool.lookup)
     
     def process_claim(self, claim: Dict[str, Any]) -> Dict[str, Any]:
         """Process claim using hard-coded rules."""
         # Get policy info
-        policy_info = self.policy_tool.lookup(claim["policy_id"])
-        
-        # Calculate risk score
-        try:
-            incident_date = datetime.strptime(claim["incident_date"], "%Y-%m-%d")
-            report_date = datetime.strptime(claim["report_date"], "%Y-%m-%d")
-            incident_to_report_days = (report_date - incident_date).days
-        except:
-            incident_to_report_days = 0
+        policy_info = self._lookup_policy(claim["policy_id"])
         
+        # Calculate risk score (days to report are precomputed by run_evaluation)
         risk_result = self.risk_tool.calculate_risk_score(
             claim_amount=claim["claim_amount"],
             prior_claims=claim["prior_claims"],
             policy_tenure_years=claim["policy_tenure_years"],
-            incident_to_report_days=incident_to_report_days,
+            incident_to_report_days=incident_to_report_days(claim),
             coverage_limit=policy_info.get("coverage_limit"),
             claimant_age=claim["claimant_age"],
             location=claim["location"]
@@ -80,105 +99,381 @@ class RuleBasedSystem:
             "rationale": rationale,
             "risk_score": risk_score
         }
-
-
-class OneShotLLMSystem:
-    """One-shot LLM system without tools."""
     
-    def __init__(self, model_name: str = None):
-        self.model_name = model_name or config.LLM_MODEL
-        self.llm = ChatOpenAI(
-            model=self.model_name,
-            temperature=config.LLM_TEMPERATURE,
-            openai_api_key=config.OPENAI_API_KEY
-        )
+    def process_claims_df(self, claims_df: pd.DataFrame, max_workers: int = None) -> pd.DataFrame:
+        """
+        Process a whole DataFrame of claims with the same rules as process_claim.
+        
+        Every rule is evaluated column-wise, so the cost no longer scales with
+        per-row Python overhead. Frames of at least
+        config.RULE_PARALLEL_MIN_CLAIMS rows are split across worker processes.
+        
+        Args:
+            claims_df: Claims to process
+            max_workers: Worker processes for large frames (defaults to the CPU count)
+        
+        Returns:
+            DataFrame with one row per claim and the process_claim result keys
+            as columns
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        if len(claims_df) < config.RULE_PARALLEL_MIN_CLAIMS or max_workers < 2:
+            return self._process_claims_frame(claims_df)
+        
+        bounds = [
+            (part[0], part[-1] + 1)
+            for part in np.array_split(np.arange(len(claims_df)), max_workers)
+            if len(part)
+        ]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            parts = executor.map(
+                _process_claims_frame_in_worker,
+                (claims_df.iloc[start:stop] for start, stop in bounds)
+            )
+            return pd.concat(list(parts))
     
-    def process_claim(self, claim: Dict[str, Any]) -> Dict[str, Any]:
-        """Process claim with single LLM call, no tools."""
+    def _process_claims_frame(self, claims_df: pd.DataFrame) -> pd.DataFrame:
+        """Vectorized rule evaluation for process_claims_df."""
+        if "incident_to_report_days" not in claims_df:
+            claims_df = add_incident_to_report_days(claims_df)
+        claim_amount = claims_df["claim_amount"]
+        prior_claims = claims_df["prior_claims"]
+        
+        risk_score = self.risk_tool.calculate_risk_score_batch(
+            claims_df,
+            coverage_limit=self.policy_tool.lookup_coverage_limits(claims_df["policy_id"])
+        )["risk_score"].to_numpy()
+        
+        # Determine severity
+        severity = pd.cut(
+            claim_amount,
+            bins=[-np.inf, 5000, 25000, 75000, np.inf],
+            labels=config.SEVERITY_LEVELS,
+            right=False
+        ).astype(str).to_numpy()
+        
+        # Determine action (first matching rule wins, as in process_claim)
+        action = np.select(
+            [
+                (severity == "low") & (risk_score < 0.3) & (prior_claims < 2),
+                (severity == "critical") | (risk_score >= 0.7),
+                (risk_score >= 0.4) | (prior_claims >= 3),
+                (severity == "medium") & (risk_score < 0.4),
+            ],
+            ["approve", "escalate", "investigate", "approve"],
+            default="investigate"
+        )
+        
+        rationale = (
+            "Rule-based decision: Severity=" + pd.Series(severity, index=claims_df.index)
+            + " based on amount " + claim_amount.map("${:,.2f}".format)
+            + ". Risk score=" + pd.Series(risk_score, index=claims_df.index).map("{:.3f}".format)
+            + ". Prior claims=" + prior_claims.astype(str) + "."
+        )
         
-        prompt = f"""You are an insurance claims adjuster. Analyze the following claim and provide:
+        return pd.DataFrame({
+            "claim_id": claims_df["claim_id"],
+            "severity": severity,
+            "action": action,
+            "rationale": rationale,
+            "risk_score": risk_score
+        })
+
+
+# Rule-based system of a worker process, built on first use
+_worker_rule_system = None
+
+
+def _process_claims_frame_in_worker(claims_df: pd.DataFrame) -> pd.DataFrame:
+    """ProcessPoolExecutor entry point for RuleBasedSystem.process_claims_df."""
+    global _worker_rule_system
+    if _worker_rule_system is None:
+        _worker_rule_system = RuleBasedSystem()
+    return _worker_rule_system._process_claims_frame(claims_df)
+
+
+_SEVERITY_GUIDELINES = """Guidelines:
+- LOW severity: < $5,000
+- MEDIUM severity: $5,000-$25,000
+- HIGH severity: $25,000-$75,000
+- CRITICAL severity: > $75,000"""
+
+# One-shot prompt pieces; only the claim details are formatted per claim
+_format_claim_details = """- Claim ID: {claim_id}
+- Type: {claim_type}
+- Amount: {claim_amount_fmt}
+- Prior Claims: {prior_claims}
+- Policy Tenure: {policy_tenure_years} years
+- Claimant Age: {claimant_age}
+- Location: {location}
+
+Narrative: {narrative}""".format_map
+
+_PROMPT_HEADER = """You are an insurance claims adjuster. Analyze the following claim and provide:
 1. Severity level (low/medium/high/critical)
 2. Recommended action (approve/investigate/deny/escalate)
 3. Brief rationale
 
 Claim Details:
-- Claim ID: {claim['claim_id']}
-- Type: {claim['claim_type']}
-- Amount: ${claim['claim_amount']:,.2f}
-- Prior Claims: {claim['prior_claims']}
-- Policy Tenure: {claim['policy_tenure_years']} years
-- Claimant Age: {claim['claimant_age']}
-- Location: {claim['location']}
+"""
 
-Narrative: {claim['narrative']}
+_PROMPT_FOOTER = f"""
 
-Guidelines:
-- LOW severity: < $5,000
-- MEDIUM severity: $5,000-$25,000
-- HIGH severity: $25,000-$75,000
-- CRITICAL severity: > $75,000
+{_SEVERITY_GUIDELINES}
 
 Respond in this format:
 SEVERITY: [level]
 ACTION: [action]
 RATIONALE: [explanation]"""
 
+_BATCH_PROMPT_HEADER = """You are an insurance claims adjuster. Analyze each of the following {count} claims and provide, for every claim:
+1. Severity level (low/medium/high/critical)
+2. Recommended action (approve/investigate/deny/escalate)
+3. Brief rationale
+
+"""
+
+_BATCH_PROMPT_FOOTER = f"""
+
+{_SEVERITY_GUIDELINES}
+
+Respond with exactly one line per claim, in the order given, in this format:
+CLAIM: [claim id] | SEVERITY: [level] | ACTION: [action] | RATIONALE: [explanation]"""
+
+# Labels anchored on their "SEVERITY:" / "ACTION:" fields (or "severity is
+# ..." phrasing), so words such as "following", "transaction" or a "low risk"
+# rationale are not mistaken for the answer
+_SEVERITY_RE = re.compile(
+    r"\bseverity(?:\s+level)?\W*(?:is\W+)?(" + "|".join(map(re.escape, config.SEVERITY_LEVELS)) + r")\b",
+    re.IGNORECASE
+)
+_ACTION_RE = re.compile(
+    r"\baction\W*(?:is\W+)?(" + "|".join(map(re.escape, config.ACTIONS)) + r")",
+    re.IGNORECASE
+)
+
+# One answer line of a batched one-shot response, tolerating list numbering and markdown
+_BATCH_ANSWER_RE = re.compile(
+    r"^[\W\d_]*CLAIM[\W_]*(?P<claim_id>\w[\w-]*\w)[\W_]*\|\s*(?P<answer>.*)$",
+    re.IGNORECASE
+)
+
+
+class OneShotLLMSystem:
+    """One-shot LLM system without tools."""
+    
+    def __init__(self, model_name: str = None, batch_size: int = None, use_cache: bool = False):
+        self.model_name = model_name or config.LLM_MODEL
+        # Claims marshaled into one prompt by process_claims_batch
+        self.batch_size = batch_size or config.LLM_BATCH_SIZE
+        self.decision_cache = DecisionCache(enabled=use_cache)
+        # Shared with the agent: one connection pool, rate limiter and retry policy
+        self.llm = get_chat_model(self.model_name, config.LLM_TEMPERATURE, config.OPENAI_API_KEY)
+    
+    def process_claim(self, claim: Dict[str, Any]) -> Dict[str, Any]:
+        """Process claim with single LLM call, no tools."""
+        cached = self.decision_cache.get(claim)
+        if cached is not None:
+            return cached
         try:
-            response = self.llm.invoke(prompt)
-            output = response.content
-            
-            # Parse response
-            severity, action = self._parse_response(output)
-            
-            return {
-                "claim_id": claim["claim_id"],
-                "severity": severity,
-                "action": action,
-                "rationale": output
-            }
+            response = self.llm.invoke(self._build_prompt(claim))
+            decision = self._build_result(claim, response.content)
         except Exception as e:
-            return {
-                "claim_id": claim["claim_id"],
-                "severity": "medium",
-                "action": "investigate",
-                "rationale": f"Error: {str(e)}"
-            }
+            return self._build_error_result(claim, e)
+        self.decision_cache.put(claim, decision)
+        return decision
+    
+    async def aprocess_claim(self, claim: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of process_claim using the model's ainvoke."""
+        cached = self.decision_cache.get(claim)
+        if cached is not None:
+            return cached
+        try:
+            response = await self.llm.ainvoke(self._build_prompt(claim))
+            decision = self._build_result(claim, response.content)
+        except Exception as e:
+            return self._build_error_result(claim, e)
+        self.decision_cache.put(claim, decision)
+        return decision
+    
+    def _build_prompt(self, claim: Dict[str, Any]) -> str:
+        """Build the one-shot prompt for a claim."""
+        # Only the claim details vary; the header and footer are constants
+        return _PROMPT_HEADER + self._format_claim_details(claim) + _PROMPT_FOOTER
+    
+    def process_claims_batch(self, claims: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Process several claims with as few LLM calls as possible.
+        
+        Claims are marshaled batch_size at a time into one prompt that asks
+        for one answer line per claim, and the prompts are sent in parallel
+        through the model's batch API.
+        """
+        cached = [self.decision_cache.get(claim) for claim in claims]
+        chunks = self._chunk_claims([claim for claim, hit in zip(claims, cached) if hit is None])
+        responses = self.llm.batch(
+            [self._build_batch_prompt(chunk) for chunk in chunks],
+            config={"max_concurrency": config.LLM_MAX_CONCURRENCY},
+            return_exceptions=True
+        ) if chunks else []
+        return self._merge_cached(claims, cached, self._collect_batch_responses(chunks, responses))
+    
+    async def aprocess_claims_batch(self, claims: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Async variant of process_claims_batch."""
+        cached = [self.decision_cache.get(claim) for claim in claims]
+        chunks = self._chunk_claims([claim for claim, hit in zip(claims, cached) if hit is None])
+        responses = await self.llm.abatch(
+            [self._build_batch_prompt(chunk) for chunk in chunks],
+            config={"max_concurrency": config.LLM_MAX_CONCURRENCY},
+            return_exceptions=True
+        ) if chunks else []
+        return self._merge_cached(claims, cached, self._collect_batch_responses(chunks, responses))
+    
+    def _merge_cached(
+        self,
+        claims: List[Dict[str, Any]],
+        cached: List[Optional[Dict[str, Any]]],
+        fresh: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Interleave cached and fresh decisions in claim order, caching the fresh ones."""
+        fresh = iter(fresh)
+        results = []
+        for claim, hit in zip(claims, cached):
+            if hit is None:
+                hit = next(fresh)
+                self.decision_cache.put(claim, hit)
+            results.append(hit)
+        return results
+    
+    def _chunk_claims(self, claims: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Split claims into prompt-sized chunks of batch_size."""
+        return [claims[i:i + self.batch_size] for i in range(0, len(claims), self.batch_size)]
+    
+    def _collect_batch_responses(
+        self,
+        chunks: List[List[Dict[str, Any]]],
+        responses: List[Any]
+    ) -> List[Dict[str, Any]]:
+        """Flatten per-prompt responses (or errors) back into per-claim decisions."""
+        results = []
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, Exception):
+                results.extend(self._build_error_result(claim, response) for claim in chunk)
+            else:
+                results.extend(self._build_batch_results(chunk, response.content))
+        return results
+    
+    def _format_claim_details(self, claim: Dict[str, Any]) -> str:
+        """Format the claim fields shown to the model."""
+        amount_fmt = claim.get("claim_amount_fmt")
+        if amount_fmt is None:
+            amount_fmt = f"${claim['claim_amount']:,.2f}"
+        return _format_claim_details({**claim, "claim_amount_fmt": amount_fmt})
+    
+    def _build_batch_prompt(self, claims: List[Dict[str, Any]]) -> str:
+        """Build one prompt covering several claims."""
+        claim_sections = "\n\n".join(
+            f"Claim {i}:\n{self._format_claim_details(claim)}"
+            for i, claim in enumerate(claims, 1)
+        )
+        return _BATCH_PROMPT_HEADER.format(count=len(claims)) + claim_sections + _BATCH_PROMPT_FOOTER
+    
+    def _build_batch_results(self, claims: List[Dict[str, Any]], output: str) -> List[Dict[str, Any]]:
+        """Split a batched response into one decision per claim."""
+        answers = {}
+        for line in output.splitlines():
+            match = _BATCH_ANSWER_RE.match(line)
+            if match:
+                answers.setdefault(match.group("claim_id"), match.group("answer"))
+        
+        return [
+            self._build_result(claim, answers[claim["claim_id"]])
+            if claim["claim_id"] in answers
+            else self._build_error_result(claim, ValueError("no answer line in batched response"))
+            for claim in claims
+        ]
+    
+    def _build_result(self, claim: Dict[str, Any], output: str) -> Dict[str, Any]:
+        """Turn the LLM output into a decision dictionary."""
+        # Parse response
+        severity, action = self._parse_response(output)
+        
+        return {
+            "claim_id": claim["claim_id"],
+            "severity": severity,
+            "action": action,
+            "rationale": output
+        }
+    
+    def _build_error_result(self, claim: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """Fallback decision when the LLM call fails."""
+        return {
+            "claim_id": claim["claim_id"],
+            "severity": "medium",
+            "action": "investigate",
+            "rationale": f"Error: {str(error)}",
+            "success": False
+        }
     
     def _parse_response(self, output: str) -> tuple:
         """Parse severity and action from LLM output."""
-        output_lower = output.lower()
-        
-        # Extract severity
-        severity = "medium"
-        for sev in config.SEVERITY_LEVELS:
-            if sev in output_lower:
-                severity = sev
-                break
-        
-        # Extract action
-        action = "investigate"
-        for act in config.ACTIONS:
-            if act in output_lower:
-                action = act
-                break
+        severity_match = _SEVERITY_RE.search(output)
+        action_match = _ACTION_RE.search(output)
         
-        return severity, action
+        return (
+            severity_match.group(1).lower() if severity_match else "medium",
+            action_match.group(1).lower() if action_match else "investigate"
+        )
 
 
 class EvaluationSystem:
     """System to evaluate and compare different approaches."""
     
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
         self.logger = ClaimsLogger()
+        # use_cache=False gives cold LLM timings, with no reused decisions
         self.systems = {
             "rule_based": RuleBasedSystem(),
-            "one_shot_llm": OneShotLLMSystem(),
-            "agentic": InsuranceClaimsAgent()
+            "one_shot_llm": OneShotLLMSystem(use_cache=use_cache),
+            "agentic": InsuranceClaimsAgent(use_cache=use_cache)
         }
     
-    def evaluate_all_systems(self, test_claims: pd.DataFrame) -> Dict[str, Any]:
-        """Evaluate all systems on test claims."""
+    def evaluate_all_systems(
+        self,
+        test_claims: pd.DataFrame,
+        early_stop_margin: float = None,
+        progress_callback: Callable[[str, int, int], None] = None
+    ) -> Dict[str, Any]:
+        """
+        Evaluate all systems on test claims.
+        
+        Args:
+            test_claims: Claims to evaluate, with ground truth columns
+            early_stop_margin: If set, stop evaluating a system once its mean
+                accuracy can no longer come within this margin of the best
+                system evaluated so far
+            progress_callback: Called as (system_name, completed, total)
+                whenever claims finish (see evaluate_system)
+        """
+        # One coroutine for every system, so they all share the event loop
+        # (and the pooled LLM connections opened on it)
+        return self._run_reporting_progress(
+            lambda report: self.aevaluate_all_systems(test_claims, early_stop_margin, report),
+            progress_callback
+        )
+    
+    async def aevaluate_all_systems(
+        self,
+        test_claims: pd.DataFrame,
+        early_stop_margin: float = None,
+        progress_callback: Callable[[str, int, int], None] = None
+    ) -> Dict[str, Any]:
+        """Async variant of evaluate_all_systems."""
         results = {}
+        best_accuracy = None
+        
+        # Convert the claims to plain dicts once, shared by every system
+        claim_records = test_claims.to_dict("records")
         
         print("\n" + "="*80)
         print("EVALUATING INSURANCE CLAIMS SYSTEMS")
@@ -188,7 +483,19 @@ class EvaluationSystem:
             print(f"\n[{system_name.upper()}]")
             print("-" * 80)
             
-            system_results = self.evaluate_system(system, test_claims, system_name)
+            early_stop_threshold = None
+            if early_stop_margin is not None and best_accuracy is not None:
+                early_stop_threshold = best_accuracy - early_stop_margin
+            
+            system_results = await self.aevaluate_system(
+                system, test_claims, system_name, claim_records=claim_records,
+                early_stop_threshold=early_stop_threshold,
+                progress_callback=progress_callback
+            )
+            # Persist the per-claim predictions and drop them from memory
+            system_results["predictions_path"] = str(await asyncio.to_thread(
+                self._save_predictions, system_name, system_results.pop("predictions")
+            ))
             results[system_name] = system_results
             
             # Print summary
@@ -196,6 +503,11 @@ class EvaluationSystem:
             print(f"  Severity Accuracy: {system_results['severity_accuracy']:.2%}")
             print(f"  Action Accuracy: {system_results['action_accuracy']:.2%}")
             print(f"  Processing Time: {system_results['avg_processing_time']:.2f}s")
+            if system_results["truncated"]:
+                print("  (stopped early: cannot catch up with the best system)")
+            else:
+                accuracy = (system_results["severity_accuracy"] + system_results["action_accuracy"]) / 2
+                best_accuracy = accuracy if best_accuracy is None else max(best_accuracy, accuracy)
             
             # Log results
             self.logger.log_evaluation_result(system_name, system_results)
@@ -209,7 +521,7 @@ class EvaluationSystem:
         self._print_comparison(comparison)
         
         # Save results
-        self._save_results(results, comparison)
+        await asyncio.to_thread(self._save_results, results, comparison)
         
         return {
             "individual_results": results,
@@ -220,76 +532,256 @@ class EvaluationSystem:
         self,
         system: Any,
         test_claims: pd.DataFrame,
-        system_name: str
+        system_name: str,
+        max_concurrency: int = None,
+        claim_records: List[Dict[str, Any]] = None,
+        early_stop_threshold: float = None,
+        progress_callback: Callable[[str, int, int], None] = None
     ) -> Dict[str, Any]:
-        """Evaluate a single system."""
-        predictions = []
-        processing_times = []
-        
-        for idx, claim in test_claims.iterrows():
-            claim_dict = claim.to_dict()
-            
-            start_time = datetime.now()
-            try:
-                result = system.process_claim(claim_dict)
-                processing_time = (datetime.now() - start_time).total_seconds()
-                
-                predictions.append({
-                    "claim_id": claim_dict["claim_id"],
-                    "predicted_severity": result["severity"],
-                    "predicted_action": result["action"],
-                    "true_severity": claim_dict["ground_truth_severity"],
-                    "true_action": claim_dict["ground_truth_action"],
-                    "processing_time": processing_time
-                })
-                processing_times.append(processing_time)
-                
-            except Exception as e:
-                print(f"  Error processing {claim_dict['claim_id']}: {str(e)}")
-                predictions.append({
-                    "claim_id": claim_dict["claim_id"],
-                    "predicted_severity": "unknown",
-                    "predicted_action": "escalate",
-                    "true_severity": claim_dict["ground_truth_severity"],
-                    "true_action": claim_dict["ground_truth_action"],
-                    "processing_time": 0
-                })
+        """
+        Evaluate a single system.
+        
+        Claims are processed concurrently, since the LLM-backed systems spend
+        nearly all of their time waiting on API round-trips.
+        
+        Args:
+            system: System exposing process_claim (and optionally the async,
+                batched or DataFrame variants)
+            test_claims: Claims to evaluate, with ground truth columns
+            system_name: Name used in logs and results
+            max_concurrency: Maximum number of claims (or batches) in flight
+            claim_records: test_claims already converted with to_dict("records"),
+                to skip converting again for every system
+            early_stop_threshold: If set, stop as soon as the final mean of
+                severity and action accuracy can no longer reach it; the
+                metrics then cover the claims processed so far and are
+                marked truncated
+            progress_callback: Called as (system_name, completed, total) each
+                time claims finish, on the thread that called evaluate_system,
+                so callers can report results as they come in
+        """
+        return self._run_reporting_progress(
+            lambda report: self.aevaluate_system(
+                system, test_claims, system_name, max_concurrency, claim_records,
+                early_stop_threshold, report
+            ),
+            progress_callback
+        )
+    
+    @staticmethod
+    def _run_reporting_progress(
+        make_coro: Callable[[Optional[Callable[[str, int, int], None]]], Any],
+        progress_callback: Callable[[str, int, int], None] = None
+    ) -> Any:
+        """
+        Run make_coro(report) on the shared event loop and return its result.
+        
+        The coroutine runs on the loop's thread, so its progress reports are
+        queued and replayed here, on the calling thread (Streamlit elements can
+        only be updated from the script's own thread).
+        """
+        if progress_callback is None:
+            return run_async(make_coro(None))
+        
+        updates = queue.SimpleQueue()
+        future = asyncio.run_coroutine_threadsafe(
+            make_coro(lambda *args: updates.put(args)), event_loop()
+        )
+        try:
+            # Every report is queued before the future completes
+            while not (future.done() and updates.empty()):
+                try:
+                    update = updates.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                progress_callback(*update)
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+    
+    async def aevaluate_system(
+        self,
+        system: Any,
+        test_claims: pd.DataFrame,
+        system_name: str,
+        max_concurrency: int = None,
+        claim_records: List[Dict[str, Any]] = None,
+        early_stop_threshold: float = None,
+        progress_callback: Callable[[str, int, int], None] = None
+    ) -> Dict[str, Any]:
+        """Async variant of evaluate_system."""
+        if hasattr(system, "process_claims_df"):
+            # Column-wise systems handle the whole frame in one call
+            outcomes = await asyncio.to_thread(self._evaluate_frame, system, test_claims)
+            print(f"  Processed {len(test_claims)}/{len(test_claims)} claims...")
+            if progress_callback is not None:
+                progress_callback(system_name, len(test_claims), len(test_claims))
+            return self._summarize_outcomes(outcomes)
+        
+        semaphore = asyncio.Semaphore(max_concurrency or config.EVAL_MAX_CONCURRENCY)
+        total = len(test_claims)
+        completed = 0
+        
+        # Plain dicts, so concurrent workers never touch the DataFrame
+        claim_dicts = claim_records if claim_records is not None else test_claims.to_dict("records")
+        # Systems that marshal several claims into one LLM call get them in chunks
+        chunk_size = getattr(system, "batch_size", 1)
+        chunks = [claim_dicts[i:i + chunk_size] for i in range(0, len(claim_dicts), chunk_size)]
+        
+        async def evaluate_chunk(index: int, chunk: List[Dict[str, Any]]) -> tuple:
+            nonlocal completed
+            async with semaphore:
+                outcomes = await self._evaluate_chunk(system, chunk)
             
             # Progress indicator
-            if (idx + 1) % 10 == 0:
-                print(f"  Processed {idx + 1}/{len(test_claims)} claims...")
+            previous, completed = completed, completed + len(chunk)
+            if completed // 10 > previous // 10:
+                print(f"  Processed {completed}/{total} claims...")
+            if progress_callback is not None:
+                progress_callback(system_name, completed, total)
+            return index, outcomes
+        
+        tasks = [asyncio.create_task(evaluate_chunk(i, chunk)) for i, chunk in enumerate(chunks)]
+        chunk_outcomes = [None] * len(chunks)
+        truncated = False
+        scored = correct = 0
+        
+        for next_chunk in asyncio.as_completed(tasks):
+            index, outcomes = await next_chunk
+            chunk_outcomes[index] = outcomes
+            if early_stop_threshold is None:
+                continue
+            
+            # Best final score if every remaining claim got both labels right
+            scored += len(outcomes)
+            correct += sum(
+                (prediction.predicted_severity == prediction.true_severity) +
+                (prediction.predicted_action == prediction.true_action)
+                for prediction, _ in outcomes
+            )
+            max_possible = (correct + 2 * (total - scored)) / (2 * total)
+            if max_possible < early_stop_threshold:
+                truncated = scored < total
+                break
+        
+        if truncated:
+            print(f"  Stopping early after {scored}/{total} claims")
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        return self._summarize_outcomes(
+            [outcome for chunk in chunk_outcomes if chunk is not None for outcome in chunk],
+            truncated=truncated
+        )
+    
+    def _summarize_outcomes(self, outcomes: List[tuple], truncated: bool = False) -> Dict[str, Any]:
+        """Compute the metrics for (prediction, processing time) outcomes."""
+        predictions = [prediction for prediction, _ in outcomes]
+        processing_times = [elapsed for _, elapsed in outcomes if elapsed is not None]
         
         # Calculate metrics
         metrics = self._calculate_metrics(predictions)
         metrics["avg_processing_time"] = np.mean(processing_times) if processing_times else 0
         metrics["predictions"] = predictions
+        metrics["truncated"] = truncated
         
         return metrics
     
-    def _calculate_metrics(self, predictions: List[Dict]) -> Dict[str, Any]:
+    def _evaluate_frame(self, system: Any, test_claims: pd.DataFrame) -> List[tuple]:
+        """
+        Run a whole DataFrame through a column-wise system.
+        
+        Returns (prediction, processing time) per claim; every claim is charged
+        an equal share of the call, or counts as failed if the call raised.
+        """
+        start_time = time.perf_counter()
+        try:
+            results = system.process_claims_df(test_claims)
+            processing_time = (time.perf_counter() - start_time) / max(len(test_claims), 1)
+        except Exception as e:
+            print(f"  Error processing claims: {str(e)}")
+            results = pd.DataFrame({
+                "severity": "unknown",
+                "action": "escalate"
+            }, index=test_claims.index)
+            processing_time = None
+        
+        return [
+            (Prediction(
+                claim_id, severity, action, true_severity, true_action, processing_time or 0
+            ), processing_time)
+            for claim_id, severity, action, true_severity, true_action in zip(
+                test_claims["claim_id"],
+                results["severity"],
+                results["action"],
+                test_claims["ground_truth_severity"],
+                test_claims["ground_truth_action"]
+            )
+        ]
+    
+    async def _evaluate_chunk(self, system: Any, chunk: List[Dict[str, Any]]) -> List[tuple]:
+        """
+        Run claims through a system and pair the results with the ground truth.
+        
+        Returns (prediction, processing time) per claim, with None as the time
+        when the system raised. Claims sharing one batched call are each
+        charged an equal share of its time.
+        """
+        start_time = time.perf_counter()
+        try:
+            if getattr(system, "batch_size", 1) > 1:
+                results = await system.aprocess_claims_batch(chunk)
+            elif hasattr(system, "aprocess_claim"):
+                results = [await system.aprocess_claim(chunk[0])]
+            else:
+                # Synchronous systems run in a worker thread
+                results = [await asyncio.to_thread(system.process_claim, chunk[0])]
+            processing_time = (time.perf_counter() - start_time) / len(chunk)
+            
+            return [
+                (Prediction(
+                    claim_dict["claim_id"],
+                    result["severity"],
+                    result["action"],
+                    claim_dict["ground_truth_severity"],
+                    claim_dict["ground_truth_action"],
+                    processing_time
+                ), processing_time)
+                for claim_dict, result in zip(chunk, results)
+            ]
+            
+        except Exception as e:
+            outcomes = []
+            for claim_dict in chunk:
+                print(f"  Error processing {claim_dict['claim_id']}: {str(e)}")
+                outcomes.append((Prediction(
+                    claim_dict["claim_id"],
+                    "unknown",
+                    "escalate",
+                    claim_dict["ground_truth_severity"],
+                    claim_dict["ground_truth_action"],
+                    0
+                ), None))
+            return outcomes
+    
+    def _calculate_metrics(self, predictions: List[Prediction]) -> Dict[str, Any]:
         """Calculate evaluation metrics."""
-        # Extract predictions and ground truth
-        pred_severities = [p["predicted_severity"] for p in predictions]
-        true_severities = [p["true_severity"] for p in predictions]
-        pred_actions = [p["predicted_action"] for p in predictions]
-        true_actions = [p["true_action"] for p in predictions]
-        
-        # Severity metrics
-        severity_accuracy = accuracy_score(true_severities, pred_severities)
-        severity_precision, severity_recall, severity_f1, _ = precision_recall_fscore_support(
-            true_severities, pred_severities, average="weighted", zero_division=0
+        # Extract predictions and ground truth as columns
+        pred_severities = [p.predicted_severity for p in predictions]
+        true_severities = [p.true_severity for p in predictions]
+        pred_actions = [p.predicted_action for p in predictions]
+        true_actions = [p.true_action for p in predictions]
+        
+        # Severity and action metrics over the fixed label sets
+        severity_accuracy, severity_precision, severity_recall, severity_f1, severity_cm = (
+            self._label_metrics(true_severities, pred_severities, config.SEVERITY_LEVELS)
         )
-        
-        # Action metrics
-        action_accuracy = accuracy_score(true_actions, pred_actions)
-        action_precision, action_recall, action_f1, _ = precision_recall_fscore_support(
-            true_actions, pred_actions, average="weighted", zero_division=0
+        action_accuracy, action_precision, action_recall, action_f1, action_cm = (
+            self._label_metrics(true_actions, pred_actions, config.ACTIONS)
         )
         
-        # Confusion matrices
-        severity_cm = confusion_matrix(true_severities, pred_severities, labels=config.SEVERITY_LEVELS)
-        action_cm = confusion_matrix(true_actions, pred_actions, labels=config.ACTIONS)
-        
         return {
             "severity_accuracy": severity_accuracy,
             "severity_precision": severity_precision,
@@ -303,6 +795,49 @@ class EvaluationSystem:
             "action_confusion_matrix": action_cm.tolist()
         }
     
+    @staticmethod
+    def _label_metrics(y_true: List[str], y_pred: List[str], labels: List[str]) -> tuple:
+        """
+        Accuracy, weighted precision/recall/F1 and confusion matrix for one label set.
+        
+        Matches sklearn's accuracy_score, precision_recall_fscore_support
+        (average="weighted", zero_division=0) and confusion_matrix with the
+        given labels. Predictions outside labels (e.g. "unknown") count as
+        wrong but get no column of their own.
+        """
+        true_codes = pd.Categorical(y_true, categories=labels).codes
+        pred_codes = pd.Categorical(y_pred, categories=labels).codes
+        n_labels = len(labels)
+        
+        accuracy = float(np.mean(np.asarray(y_true) == np.asarray(y_pred))) if len(y_true) else 0.0
+        
+        # Confusion matrix over rows where both sides are known labels
+        known = (true_codes >= 0) & (pred_codes >= 0)
+        cm = np.zeros((n_labels, n_labels), dtype=np.int64)
+        np.add.at(cm, (true_codes[known], pred_codes[known]), 1)
+        
+        # Support and predicted counts include rows whose other side is unknown
+        support = np.bincount(true_codes[true_codes >= 0], minlength=n_labels)
+        predicted = np.bincount(pred_codes[pred_codes >= 0], minlength=n_labels)
+        true_positives = np.diag(cm)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = np.where(predicted > 0, true_positives / predicted, 0.0)
+            recall = np.where(support > 0, true_positives / support, 0.0)
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        
+        total_support = support.sum()
+        if total_support == 0:
+            return accuracy, 0.0, 0.0, 0.0, cm
+        weights = support / total_support
+        return (
+            accuracy,
+            float(precision @ weights),
+            float(recall @ weights),
+            float(f1 @ weights),
+            cm
+        )
+    
     def compare_systems(self, results: Dict[str, Dict]) -> Dict[str, Any]:
         """Compare systems and identify best performer."""
         comparison = {
@@ -351,14 +886,23 @@ class EvaluationSystem:
             marker = " ⭐ BEST" if system == comparison["best_system"] else ""
             print(f"  {system:20s}: {score:.2%}{marker}")
     
+    def _save_predictions(self, system_name: str, predictions: List[Prediction]):
+        """Save a system's per-claim predictions to a columnar file."""
+        predictions_df = pd.DataFrame([asdict(p) for p in predictions])
+        output_file = config.DATA_DIR / f"predictions_{system_name}.parquet"
+        try:
+            predictions_df.to_parquet(output_file, index=False)
+        except ImportError:
+            output_file = output_file.with_suffix(".csv")
+            predictions_df.to_csv(output_file, index=False)
+        
+        return output_file
+    
     def _save_results(self, results: Dict, comparison: Dict):
         """Save evaluation results to file."""
         output = {
             "timestamp": datetime.now().isoformat(),
-            "individual_results": {
-                system: {k: v for k, v in res.items() if k != "predictions"}
-                for system, res in results.items()
-            },
+            "individual_results": results,
             "comparison": comparison
         }
         
@@ -372,10 +916,26 @@ class EvaluationSystem:
         self.logger.save_log()
 
 
-def run_evaluation(num_test_claims: int = 50):
-    """Run full evaluation on test claims."""
-    # Load claims data
-    claims_df = pd.read_csv(config.CLAIMS_DATA_PATH)
+def run_evaluation(
+    num_test_claims: int = 50,
+    use_cache: bool = True,
+    early_stop_margin: float = None,
+    progress_callback: Callable[[str, int, int], None] = None
+):
+    """
+    Run full evaluation on test claims.
+    
+    Args:
+        num_test_claims: Number of claims to evaluate
+        use_cache: Reuse LLM decisions for claims identical to earlier ones;
+            disable for true cold measurements
+        early_stop_margin: Stop evaluating systems that fall more than this
+            far behind the best one so far (see evaluate_all_systems)
+        progress_callback: Called as (system_name, completed, total) as
+            claims finish
+    """
+    # Load claims data, parsing the report dates once for every system
+    claims_df = add_incident_to_report_days(load_claims_data())
     
     # Select test claims
     test_claims = claims_df.head(num_test_claims)
@@ -383,12 +943,28 @@ def run_evaluation(num_test_claims: int = 50):
     print(f"\nRunning evaluation on {len(test_claims)} test claims...")
     
     # Run evaluation
-    evaluator = EvaluationSystem()
-    results = evaluator.evaluate_all_systems(test_claims)
+    evaluator = EvaluationSystem(use_cache=use_cache)
+    results = evaluator.evaluate_all_systems(
+        test_claims,
+        early_stop_margin=early_stop_margin,
+        progress_callback=progress_callback
+    )
     
     return results
 
 
 if __name__ == "__main__":
-    run_evaluation(num_test_claims=30)
+    parser = argparse.ArgumentParser(description="Evaluate the claims processing systems.")
+    parser.add_argument("--num-claims", type=int, default=30, help="number of test claims")
+    parser.add_argument("--no-cache", action="store_true", help="disable the LLM decision cache")
+    parser.add_argument(
+        "--early-stop-margin", type=float, default=None,
+        help="stop evaluating a system once it cannot get within this accuracy of the best so far"
+    )
+    args = parser.parse_args()
+    run_evaluation(
+        num_test_claims=args.num_claims,
+        use_cache=not args.no_cache,
+        early_stop_margin=args.early_stop_margin
+    )
 
@@ -2,19 +2,122 @@
 
 import json
 import logging
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional
 import config
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+
+# One thread writes every logger's batches, in the order they were handed
+# over, so async callers never block their event loop on file I/O
+_WRITE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="claims-log-writer")
+
+
+class _LogWriter:
+    """
+    Buffered JSON Lines writer behind a ClaimsLogger.
+    
+    Holds no reference back to its logger, so the logger can be garbage
+    collected and a finalizer can still flush and close the file.
+    """
+    
+    def __init__(self, log_file: Path):
+        self.log_file = log_file
+        self.pending = deque()
+        self.file = None
+        self.lock = threading.RLock()
+    
+    def flush(self, wait: bool = True):
+        """
+        Hand buffered entries to the writer thread.
+        
+        With wait set, returns once they (and every batch handed over before
+        them) are in the log file.
+        """
+        with self.lock:
+            entries = list(self.pending)
+            self.pending.clear()
+        # Waiting with nothing pending still waits for earlier batches
+        if entries or wait:
+            self._submit(self._write, entries, wait=wait)
+    
+    def close(self, wait: bool = True):
+        """Flush buffered entries and close the log file."""
+        self.flush(wait=False)
+        self._submit(self._close_file, wait=wait)
+    
+    def _submit(self, fn, *args, wait: bool):
+        try:
+            future = _WRITE_EXECUTOR.submit(fn, *args)
+        except RuntimeError:
+            # The interpreter is shutting down and the writer thread is gone
+            fn(*args)
+            return
+        if wait:
+            future.result()
+    
+    def _write(self, entries: list):
+        if not entries:
+            return
+        if self.file is None:
+            self.file = open(self.log_file, "ab", buffering=1 << 20)
+        self.file.write(b"".join(self.serialize(entry) for entry in entries))
+        self.file.flush()
+    
+    def _close_file(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+    
+    @staticmethod
+    def serialize(entry: Dict[str, Any]) -> bytes:
+        """Serialize an entry as one JSON line, with an ISO-format timestamp."""
+        # Entries carry a raw time.time() float; it is only formatted here, at flush
+        entry = {**entry, "timestamp": datetime.fromtimestamp(entry["timestamp"]).isoformat()}
+        if orjson is not None:
+            return orjson.dumps(
+                entry,
+                default=str,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+            )
+        return (json.dumps(entry, default=str) + "\n").encode("utf-8")
+
 
 class ClaimsLogger:
     """Comprehensive logger for agent operations and decisions."""
     
+    # Number of buffered entries that triggers a write to the log file
+    FLUSH_EVERY = 64
+    
     def __init__(self, log_level: str = "INFO"):
         self.log_dir = config.LOGS_DIR
-        self.log_file = self.log_dir / f"agent_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        self.log_entries = []
+        self.log_file = self.log_dir / f"agent_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        
+        # Entries are written as JSON Lines through one long-lived handle,
+        # buffered briefly and flushed in batches; the file is the only full
+        # record, so memory stays flat however long the run
+        self._writer = _LogWriter(self.log_file)
+        self._pending = self._writer.pending
+        self._lock = self._writer.lock
+        # Closes the file once this logger is collected, or at interpreter exit;
+        # it does not wait, since collection may happen on the writer thread
+        weakref.finalize(self, self._writer.close, False)
+        
+        # Running counts behind the summary statistics, kept as entries are
+        # added so queries never rescan the log file
+        self._tool_counts: Dict[str, int] = {}
+        self._claim_processed_count = 0
+        self._override_count = 0
         
         # Setup standard logging
         logging.basicConfig(
@@ -26,7 +129,7 @@ class ClaimsLogger:
     def log_tool_call(self, tool_name: str, inputs: Dict[str, Any], output: Any):
         """Log a tool invocation."""
         entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.time(),
             "type": "tool_call",
             "tool_name": tool_name,
             "inputs": inputs,
@@ -38,7 +141,7 @@ class ClaimsLogger:
     def log_agent_step(self, step_name: str, data: Dict[str, Any]):
         """Log an agent processing step."""
         entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.time(),
             "type": "agent_step",
             "step_name": step_name,
             "data": data
@@ -55,7 +158,7 @@ class ClaimsLogger:
     ):
         """Log a human override of agent decision."""
         entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.time(),
             "type": "human_override",
             "claim_id": claim_id,
             "original_decision": original_decision,
@@ -68,7 +171,7 @@ class ClaimsLogger:
     def log_evaluation_result(self, system_name: str, metrics: Dict[str, Any]):
         """Log evaluation results."""
         entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.time(),
             "type": "evaluation",
             "system_name": system_name,
             "metrics": metrics
@@ -79,7 +182,7 @@ class ClaimsLogger:
     def log_error(self, error_type: str, error_message: str, context: Optional[Dict] = None):
         """Log an error."""
         entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.time(),
             "type": "error",
             "error_type": error_type,
             "error_message": error_message,
@@ -89,61 +192,80 @@ class ClaimsLogger:
         self.logger.error(f"{error_type}: {error_message}")
     
     def _add_entry(self, entry: Dict[str, Any]):
-        """Add entry to in-memory log."""
-        self.log_entries.append(entry)
+        """Add entry to the pending write buffer."""
+        with self._lock:
+            if entry["type"] == "tool_call":
+                tool_name = entry["tool_name"]
+                self._tool_counts[tool_name] = self._tool_counts.get(tool_name, 0) + 1
+            elif entry["type"] == "agent_step" and entry["step_name"] == "claim_processed":
+                self._claim_processed_count += 1
+            elif entry["type"] == "human_override":
+                self._override_count += 1
+            
+            self._pending.append(entry)
+            if len(self._pending) >= self.FLUSH_EVERY:
+                self._writer.flush(wait=False)
+    
+    def flush(self):
+        """Write buffered entries to the log file."""
+        self._writer.flush()
+    
+    def close(self):
+        """Flush buffered entries and close the log file."""
+        self._writer.close()
     
     def save_log(self):
         """Save accumulated logs to file."""
-        with open(self.log_file, 'w') as f:
-            json.dump(self.log_entries, f, indent=2, default=str)
+        self.flush()
         self.logger.info(f"Log saved to {self.log_file}")
     
+    def _iter_entries(self) -> Iterator[Dict[str, Any]]:
+        """Stream every entry logged so far back from the log file."""
+        self.flush()
+        if not self.log_file.exists():
+            return
+        loads = orjson.loads if orjson is not None else json.loads
+        with open(self.log_file, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield loads(line)
+    
     def get_logs(
         self,
         log_type: Optional[str] = None,
         claim_id: Optional[str] = None
     ) -> list:
         """Retrieve logs with optional filtering."""
-        logs = self.log_entries
+        logs = self._iter_entries()
         
         if log_type:
-            logs = [log for log in logs if log.get("type") == log_type]
+            logs = (log for log in logs if log.get("type") == log_type)
         
         if claim_id:
-            logs = [
+            logs = (
                 log for log in logs
                 if log.get("claim_id") == claim_id or
                 log.get("data", {}).get("claim_id") == claim_id
-            ]
+            )
         
-        return logs
+        return list(logs)
     
     def get_tool_call_stats(self) -> Dict[str, Any]:
         """Get statistics on tool calls."""
-        tool_calls = [log for log in self.log_entries if log.get("type") == "tool_call"]
-        
-        if not tool_calls:
-            return {"total_calls": 0, "by_tool": {}}
-        
-        tool_counts = {}
-        for call in tool_calls:
-            tool_name = call.get("tool_name")
-            tool_counts[tool_name] = tool_counts.get(tool_name, 0) + 1
+        with self._lock:
+            tool_counts = dict(self._tool_counts)
         
         return {
-            "total_calls": len(tool_calls),
+            "total_calls": sum(tool_counts.values()),
             "by_tool": tool_counts
         }
     
     def get_override_rate(self) -> float:
         """Calculate the human override rate."""
-        total_decisions = len([log for log in self.log_entries if log.get("type") == "agent_step" and log.get("step_name") == "claim_processed"])
-        overrides = len([log for log in self.log_entries if log.get("type") == "human_override"])
-        
-        if total_decisions == 0:
+        if self._claim_processed_count == 0:
             return 0.0
         
-        return overrides / total_decisions
+        return self._override_count / self._claim_processed_count
 
 
 class PerformanceTracker:
@@ -1,5 +1,6 @@
 """Streamlit UI for Insurance Claims Agent POC."""
 
+import importlib
 import streamlit as st
 import pandas as pd
 import json
@@ -7,10 +8,14 @@ from datetime import datetime
 import time
 from pathlib import Path
 import config
-from agent import InsuranceClaimsAgent
-from tools import TriageLoggerTool
+from agent import run_async
+from tools import TriageLoggerTool, load_claims_data
 from logger import ClaimsLogger, PerformanceTracker
-from evaluation import RuleBasedSystem, OneShotLLMSystem
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
 
 
 # Page configuration
@@ -21,10 +26,45 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+
+@st.cache_data(show_spinner=False)
+def _load_claims(path: str, mtime: float) -> pd.DataFrame:
+    """Load the claims once per file version, shared by every session."""
+    return load_claims_data(path)
+
+
+@st.cache_resource(show_spinner=False)
+def _generate_once(num_claims: int = 200):
+    """Generate and save the synthetic data once per process."""
+    import data_generator
+    generator = data_generator.ClaimsDataGenerator(num_claims=num_claims)
+    claims_df = generator.generate_claims()
+    policies_df = generator.generate_policies(claims_df)
+    generator.save_data(claims_df, policies_df)
+    return claims_df, policies_df
+
+
+@st.cache_resource(show_spinner=False)
+def _claims_index(path: str, mtime: float) -> dict:
+    """
+    Map each claim_id to its claim as a plain dict, once per file version.
+    
+    The index is only read, so every session shares one copy instead of
+    hashing the DataFrame and unpickling its own on every rerun.
+    """
+    return {claim["claim_id"]: claim for claim in _load_claims(path, mtime).to_dict("records")}
+
+
+def _claims_file_key() -> tuple:
+    """(path, mtime) of the claims file, the key of the cached claims."""
+    return str(config.CLAIMS_DATA_PATH), config.CLAIMS_DATA_PATH.stat().st_mtime
+
+
 # Initialize session state
 if "claims_data" not in st.session_state:
     try:
-        st.session_state.claims_data = pd.read_csv(config.CLAIMS_DATA_PATH)
+        st.session_state.claims_key = _claims_file_key()
+        st.session_state.claims_data = _load_claims(*st.session_state.claims_key)
     except FileNotFoundError:
         st.session_state.claims_data = None
 
@@ -44,8 +84,9 @@ if "current_decision" not in st.session_state:
     st.session_state.current_decision = None
 
 
-# CSS styling
-st.markdown("""
+# CSS styling. Streamlit drops any element a rerun does not emit again, so
+# the stylesheet is re-sent on every run; only the string is built once
+_CSS = """
 <style>
     .main-header {
         font-size: 3rem;
@@ -90,21 +131,49 @@ st.markdown("""
         text-align: center;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(_CSS, unsafe_allow_html=True)
+
+# Summary card shown above the decision history
+_METRIC_CARD = """
+<div class="metric-card">
+    <h3>{value}</h3>
+    <p>{label}</p>
+</div>
+"""
+
+# Logo shown in the header and the sidebar; checked once per run
+_LOGO_PATH = Path(__file__).parent / "assets" / "zurich_logo.png"
+_LOGO_EXISTS = _LOGO_PATH.exists()
+
+
+# (module, class) of each agent system by its name in the sidebar selector;
+# imported on first use so the UI renders without loading the evaluation
+# systems (agent itself defers LangChain until a model is built)
+SYSTEM_TYPES = {
+    "Agentic System": ("agent", "InsuranceClaimsAgent"),
+    "Rule-Based": ("evaluation", "RuleBasedSystem"),
+    "One-Shot LLM": ("evaluation", "OneShotLLMSystem"),
+}
+
 
+@st.cache_resource(show_spinner=False)
+def _make_agent(system_type: str):
+    """Build an agent system once per process; every session shares it."""
+    module_name, class_name = SYSTEM_TYPES[system_type]
+    return getattr(importlib.import_module(module_name), class_name)()
 
-def load_agent(system_type: str):
-    """Load the selected agent system."""
-    if system_type == "Agentic System":
-        return InsuranceClaimsAgent()
-    elif system_type == "Rule-Based":
-        return RuleBasedSystem()
-    elif system_type == "One-Shot LLM":
-        return OneShotLLMSystem()
-    return None
 
+def load_agent(system_type: str, reload: bool = False):
+    """Load the selected agent system, rebuilding it if reload is set."""
+    if system_type not in SYSTEM_TYPES:
+        return None
+    if reload:
+        _make_agent.clear()
+    return _make_agent(system_type)
 
-def display_claim_info(claim: pd.Series):
+
+def display_claim_info(claim: dict):
     """Display claim information."""
     col1, col2, col3 = st.columns(3)
     
@@ -156,11 +225,16 @@ def process_claim(claim_dict: dict, system_type: str):
         st.session_state.agent = load_agent(system_type)
     
     with st.spinner("🔄 Processing claim..."):
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
-            result = st.session_state.agent.process_claim(claim_dict)
-            processing_time = time.time() - start_time
+            system = st.session_state.agent
+            if hasattr(system, "aprocess_claim"):
+                # LLM-backed systems run on the agent's shared loop, overlapping tool calls
+                result = run_async(system.aprocess_claim(claim_dict))
+            else:
+                result = system.process_claim(claim_dict)
+            processing_time = time.perf_counter() - start_time
             
             result["processing_time"] = processing_time
             result["timestamp"] = datetime.now().isoformat()
@@ -186,7 +260,7 @@ def handle_accept_decision(decision: dict, claim: dict):
         "claim_id": claim["claim_id"],
         "decision": decision,
         "status": "accepted",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": time.time(),
         "ground_truth_severity": claim.get("ground_truth_severity"),
         "ground_truth_action": claim.get("ground_truth_action")
     })
@@ -214,7 +288,7 @@ def handle_override_decision(decision: dict, claim: dict, override_severity: str
         "original_decision": decision,
         "override_decision": override_decision,
         "status": "overridden",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": time.time(),
         "ground_truth_severity": claim.get("ground_truth_severity"),
         "ground_truth_action": claim.get("ground_truth_action")
     })
@@ -244,55 +318,42 @@ def display_history():
     col1, col2, col3, col4 = st.columns(4)
     
     total = len(st.session_state.decision_history)
-    accepted = sum(1 for d in st.session_state.decision_history if d["status"] == "accepted")
-    overridden = sum(1 for d in st.session_state.decision_history if d["status"] == "overridden")
+    status_counts = pd.DataFrame(
+        st.session_state.decision_history, columns=["status"]
+    )["status"].value_counts()
+    accepted = int(status_counts.get("accepted", 0))
+    overridden = int(status_counts.get("overridden", 0))
     override_rate = (overridden / total * 100) if total > 0 else 0
     
-    with col1:
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>{total}</h3>
-            <p>Total Decisions</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>{accepted}</h3>
-            <p>Accepted</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>{overridden}</h3>
-            <p>Overridden</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>{override_rate:.1f}%</h3>
-            <p>Override Rate</p>
-        </div>
-        """, unsafe_allow_html=True)
+    cards = [
+        (col1, total, "Total Decisions"),
+        (col2, accepted, "Accepted"),
+        (col3, overridden, "Overridden"),
+        (col4, f"{override_rate:.1f}%", "Override Rate"),
+    ]
+    for col, value, label in cards:
+        with col:
+            st.markdown(_METRIC_CARD.format(value=value, label=label), unsafe_allow_html=True)
     
     # Decision table
     st.markdown("---")
     
-    history_df = pd.DataFrame([
-        {
-            "Claim ID": d["claim_id"],
-            "Severity": d["decision"]["severity"] if d["status"] == "accepted" else d["override_decision"]["severity"],
-            "Action": d["decision"]["action"] if d["status"] == "accepted" else d["override_decision"]["action"],
-            "Status": "✅ Accepted" if d["status"] == "accepted" else "⚠️ Overridden",
-            "Timestamp": d["timestamp"]
-        }
-        for d in reversed(st.session_state.decision_history[-20:])
-    ])
+    # Most recent 20 decisions, newest first, showing the final decision
+    recent_df = pd.DataFrame(
+        st.session_state.decision_history[:-21:-1],
+        columns=["claim_id", "status", "decision", "override_decision", "timestamp"]
+    )
+    is_accepted = recent_df["status"].eq("accepted")
+    final_decisions = recent_df["decision"].where(is_accepted, recent_df["override_decision"])
+    
+    history_df = pd.DataFrame({
+        "Claim ID": recent_df["claim_id"],
+        "Severity": final_decisions.str.get("severity"),
+        "Action": final_decisions.str.get("action"),
+        "Status": is_accepted.map({True: "✅ Accepted", False: "⚠️ Overridden"}),
+        # Timestamps are stored as epoch seconds and only formatted for display
+        "Timestamp": recent_df["timestamp"].map(lambda ts: datetime.fromtimestamp(ts).isoformat())
+    })
     
     st.dataframe(history_df, use_container_width=True)
 
@@ -300,13 +361,11 @@ def display_history():
 def main():
     """Main Streamlit app."""
     # Display Zurich logo - centered
-    logo_path = Path(__file__).parent / "assets" / "zurich_logo.png"
-    
-    if logo_path.exists():
+    if _LOGO_EXISTS:
         # Create centered columns for logo
         col1, col2, col3 = st.columns([1, 1, 1])
         with col2:
-            st.image(str(logo_path), use_container_width=True)
+            st.image(str(_LOGO_PATH), use_container_width=True)
     else:
         st.markdown('<div class="zurich-logo">🛡️ ZURICH</div>', unsafe_allow_html=True)
     
@@ -316,11 +375,10 @@ def main():
     # Sidebar
     with st.sidebar:
         # Display logo in sidebar - centered
-        logo_path = Path(__file__).parent / "assets" / "zurich_logo.png"
-        if logo_path.exists():
+        if _LOGO_EXISTS:
             # Center the logo in sidebar
             st.markdown('<div style="display: flex; justify-content: center; margin-bottom: 1rem;">', unsafe_allow_html=True)
-            st.image(str(logo_path), width=150)
+            st.image(str(_LOGO_PATH), width=150)
             st.markdown('</div>', unsafe_allow_html=True)
         else:
             st.markdown("## 🛡️ Zurich Insurance")
@@ -336,7 +394,7 @@ def main():
         )
         
         if st.button("🔄 Reload Agent"):
-            st.session_state.agent = load_agent(system_type)
+            st.session_state.agent = load_agent(system_type, reload=True)
             st.success(f"Loaded {system_type}")
         
         st.markdown("---")
@@ -349,12 +407,12 @@ def main():
             st.error("❌ No claims data found")
             if st.button("Generate Data"):
                 with st.spinner("Generating claims data..."):
-                    import data_generator
-                    generator = data_generator.ClaimsDataGenerator(num_claims=200)
-                    claims_df = generator.generate_claims()
-                    policies_df = generator.generate_policies(claims_df)
-                    generator.save_data(claims_df, policies_df)
-                    st.session_state.claims_data = claims_df
+                    # Regenerate if the saved files were removed since
+                    if not config.CLAIMS_DATA_PATH.exists():
+                        _generate_once.clear()
+                    _generate_once(200)
+                    st.session_state.claims_key = _claims_file_key()
+                    st.session_state.claims_data = _load_claims(*st.session_state.claims_key)
                     st.success("Data generated!")
                     st.rerun()
         
@@ -378,12 +436,10 @@ def main():
         st.markdown("## Select a Claim to Process")
         
         # Claim selection
-        claim_options = st.session_state.claims_data["claim_id"].tolist()
-        selected_claim_id = st.selectbox("Choose Claim ID", claim_options)
+        claims_index = _claims_index(*st.session_state.claims_key)
+        selected_claim_id = st.selectbox("Choose Claim ID", list(claims_index))
         
-        claim = st.session_state.claims_data[
-            st.session_state.claims_data["claim_id"] == selected_claim_id
-        ].iloc[0]
+        claim = claims_index[selected_claim_id]
         
         # Display claim
         display_claim_info(claim)
@@ -392,13 +448,12 @@ def main():
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
             if st.button("🚀 Process Claim", use_container_width=True, type="primary"):
-                claim_dict = claim.to_dict()
-                result = process_claim(claim_dict, system_type)
+                result = process_claim(claim, system_type)
                 
                 if result:
                     st.session_state.current_decision = {
                         "decision": result,
-                        "claim": claim_dict
+                        "claim": claim
                     }
         
         # Display decision if available
@@ -472,8 +527,22 @@ def main():
         if st.session_state.decision_history:
             if st.button("💾 Export History"):
                 history_file = config.DATA_DIR / "decision_history.json"
-                with open(history_file, 'w') as f:
-                    json.dump(st.session_state.decision_history, f, indent=2)
+                history = [
+                    {**d, "timestamp": datetime.fromtimestamp(d["timestamp"])}
+                    for d in st.session_state.decision_history
+                ]
+                if orjson is not None:
+                    # orjson writes the datetimes as ISO strings natively
+                    history_file.write_bytes(orjson.dumps(
+                        history,
+                        default=str,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                    ))
+                else:
+                    for d in history:
+                        d["timestamp"] = d["timestamp"].isoformat()
+                    with open(history_file, 'w') as f:
+                        json.dump(history, f, indent=2)
                 st.success(f"History exported to {history_file}")
     
     with tabs[2]:
@@ -485,7 +554,18 @@ def main():
         if st.button("🚀 Run Evaluation", type="primary"):
             with st.spinner("Running evaluation... This may take a few minutes."):
                 from evaluation import run_evaluation
-                results = run_evaluation(num_test_claims)
+                
+                # Report each system's progress as its claims come back
+                progress_bar = st.progress(0.0, text="Starting evaluation...")
+                
+                def show_progress(system_name: str, completed: int, total: int):
+                    progress_bar.progress(
+                        completed / total,
+                        text=f"{system_name}: {completed}/{total} claims evaluated"
+                    )
+                
+                results = run_evaluation(num_test_claims, progress_callback=show_progress)
+                progress_bar.empty()
                 
                 # Display results
                 st.success("Evaluation complete!")
@@ -0,0 +1,71 @@
+"""Regression tests for the agent's streaming early stop."""
+
+import asyncio
+
+from langchain_core.messages import AIMessageChunk
+
+from agent import InsuranceClaimsAgent
+
+
+MODEL_NODE = {"langgraph_node": "model"}
+
+
+def _tool_call_chunks(n=64):
+    """Chunks the model emits while calling triage_logger: no text content."""
+    return [
+        (
+            AIMessageChunk(
+                content="",
+                id="run-1",
+                tool_call_chunks=[{"name": None, "args": "{", "id": None, "index": 0}],
+            ),
+            MODEL_NODE,
+        )
+        for _ in range(n)
+    ]
+
+
+class _FakeGraph:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def stream(self, *args, **kwargs):
+        yield from self.chunks
+
+    async def astream(self, *args, **kwargs):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def _agent(chunks):
+    # Skips __init__, which needs an API key and builds the full agent
+    agent = InsuranceClaimsAgent.__new__(InsuranceClaimsAgent)
+    agent.agent = _FakeGraph(chunks)
+    return agent
+
+
+def test_is_decided_with_empty_parts():
+    agent = _agent([])
+    assert agent._is_decided([""] * 32) is False
+    assert agent._is_decided(["SEVERITY:"]) is False
+
+
+def test_stream_of_tool_call_chunks_only():
+    agent = _agent(_tool_call_chunks())
+    assert agent._stream_until_decided("claim") == ""
+
+
+def test_astream_of_tool_call_chunks_only():
+    agent = _agent(_tool_call_chunks())
+    assert asyncio.run(agent._astream_until_decided("claim")) == ""
+
+
+def test_stream_stops_once_decided_after_tool_calls():
+    text = [
+        (AIMessageChunk(content=word + " ", id="run-2"), MODEL_NODE)
+        for word in ("SEVERITY: high ACTION: escalate RATIONALE:".split() + ["word"] * 100)
+    ]
+    agent = _agent(_tool_call_chunks() + text)
+    output = agent._stream_until_decided("claim")
+    assert output.startswith("SEVERITY: high ACTION: escalate")
+    assert len(output.split()) == 32
@@ -0,0 +1,63 @@
+"""Tests for the decisions log written by TriageLoggerTool."""
+
+import json
+
+import pytest
+
+import config
+from tools import TriageLoggerTool
+
+
+LEGACY_ENTRY = {
+    "claim_id": "CLM-00001",
+    "timestamp": "2025-01-01T00:00:00",
+    "severity": "low",
+    "action": "approve",
+    "rationale": "Small claim on a long-standing policy",
+    "risk_score": 0.1,
+    "policy_id": "POL-0001",
+    "metadata": {},
+}
+
+
+@pytest.fixture
+def log_paths(tmp_path, monkeypatch):
+    log_file = tmp_path / "decisions_log.jsonl"
+    legacy_file = tmp_path / "decisions_log.json"
+    monkeypatch.setattr(config, "DECISIONS_LOG_PATH", log_file)
+    monkeypatch.setattr(config, "LEGACY_DECISIONS_LOG_PATH", legacy_file)
+    return log_file, legacy_file
+
+
+def test_legacy_log_is_migrated(log_paths):
+    log_file, legacy_file = log_paths
+    legacy_file.write_text(json.dumps([LEGACY_ENTRY, {**LEGACY_ENTRY, "claim_id": "CLM-00002"}], indent=2))
+    
+    tool = TriageLoggerTool()
+    
+    assert tool.get_decision_history("CLM-00001") == [LEGACY_ENTRY]
+    assert len(tool.get_decision_history()) == 2
+    assert legacy_file.exists()
+    assert not list(log_file.parent.glob("*.tmp"))
+
+
+def test_new_decisions_follow_migrated_ones(log_paths):
+    _, legacy_file = log_paths
+    legacy_file.write_text(json.dumps([LEGACY_ENTRY]))
+    
+    TriageLoggerTool().log_decision(
+        "CLM-00003", "high", "escalate", "Large claim", 0.8, {"policy_id": "POL-0003"}
+    )
+    # A second tool finds the .jsonl log and does not migrate again
+    history = TriageLoggerTool().get_decision_history()
+    
+    assert [entry["claim_id"] for entry in history] == ["CLM-00001", "CLM-00003"]
+
+
+def test_no_legacy_log(log_paths):
+    log_file, _ = log_paths
+    
+    tool = TriageLoggerTool()
+    
+    assert log_file.exists()
+    assert tool.get_decision_history() == []
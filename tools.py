@@ -1,24 +1,193 @@
 """Agent tools for insurance claims processing."""
 
+import csv
+import functools
+import os
+import numpy as np
 import pandas as pd
 import json
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, Any, Optional
 import config
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+
+def incident_to_report_days(claim: Dict[str, Any]) -> int:
+    """
+    Days between incident and report for a single claim.
+    
+    Uses the precomputed ``incident_to_report_days`` field when the claim
+    came from a prepared DataFrame, and parses the dates otherwise.
+    """
+    days = claim.get("incident_to_report_days")
+    if days is not None:
+        return int(days)
+    
+    try:
+        incident_date = datetime.strptime(claim["incident_date"], "%Y-%m-%d")
+        report_date = datetime.strptime(claim["report_date"], "%Y-%m-%d")
+        return (report_date - incident_date).days
+    except (KeyError, TypeError, ValueError):
+        return 0
+
+
+def add_incident_to_report_days(claims_df: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of claims_df with incident_to_report_days computed in one pass."""
+    claims_df = claims_df.copy()
+    incident_dates = pd.to_datetime(claims_df["incident_date"], format="%Y-%m-%d", errors="coerce", cache=True)
+    report_dates = pd.to_datetime(claims_df["report_date"], format="%Y-%m-%d", errors="coerce", cache=True)
+    claims_df["incident_to_report_days"] = (report_dates - incident_dates).dt.days.fillna(0).astype("int32")
+    return claims_df
+
+
+# Claim columns used by the agents, the app and the evaluation; any other
+# columns in the data files are skipped when loading
+CLAIMS_COLUMNS = (
+    "claim_id",
+    "policy_id",
+    "claim_type",
+    "claim_amount",
+    "incident_date",
+    "report_date",
+    "location",
+    "claimant_age",
+    "prior_claims",
+    "policy_tenure_years",
+    "narrative",
+    "ground_truth_severity",
+    "ground_truth_action",
+)
+
+# Low-cardinality columns are stored as categoricals and small counts as int16;
+# dates stay strings for prompts, amounts stay float64 so cents round-trip
+CLAIMS_DTYPES = {
+    "claim_id": "string",
+    "policy_id": "string",
+    "claim_type": "category",
+    "location": "category",
+    "claimant_age": "int16",
+    "prior_claims": "int16",
+    "policy_tenure_years": "int16",
+    "incident_date": "string",
+    "report_date": "string",
+}
+
+
+def fresh_parquet_path(path: Path) -> Optional[Path]:
+    """
+    Return the Parquet copy of a CSV data file if it is at least as fresh.
+    
+    The CSV stays the source of truth: a missing CSV raises FileNotFoundError.
+    """
+    path = Path(path)
+    parquet_path = path.with_suffix(".parquet")
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= path.stat().st_mtime:
+        return parquet_path
+    return None
+
+
+def load_claims_data(path=None) -> pd.DataFrame:
+    """
+    Load the claims table.
+    
+    Reads the Parquet copy written by the data generator when it is at least
+    as fresh as the CSV, and otherwise parses the CSV with the pyarrow engine.
+    """
+    path = Path(path or config.CLAIMS_DATA_PATH)
+    parquet_path = fresh_parquet_path(path)
+    if parquet_path is not None:
+        return pd.read_parquet(parquet_path, columns=list(CLAIMS_COLUMNS))
+    
+    try:
+        return pd.read_csv(path, engine="pyarrow", usecols=CLAIMS_COLUMNS, dtype=CLAIMS_DTYPES)
+    except ImportError:
+        return pd.read_csv(path, usecols=CLAIMS_COLUMNS, dtype=CLAIMS_DTYPES)
+
+
+def _parse_policy_number(value: str):
+    """Parse a numeric policy CSV field as int when possible, like pandas would."""
+    if value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+# Casts for the non-string columns of the policies CSV
+_POLICY_CASTS = {
+    "coverage_limit": _parse_policy_number,
+    "deductible": _parse_policy_number,
+    "claims_history_count": _parse_policy_number,
+    "is_active": lambda value: value == "True",
+}
+
+
+@functools.lru_cache(maxsize=4)
+def _read_policies(path: str, mtime: float) -> Dict[str, Dict[str, Any]]:
+    """
+    Map each policy_id to its first record, once per (path, modification time).
+    
+    Only the lookup fields are kept. The table is read-only, so it is loaded
+    straight into dicts rather than through a DataFrame.
+    """
+    fields = PolicyLookupTool.POLICY_FIELDS
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        records = pq.read_table(path, columns=list(fields)).to_pylist()
+    else:
+        with open(path, newline="") as f:
+            records = [
+                {
+                    field: _POLICY_CASTS[field](row[field]) if field in _POLICY_CASTS else row[field]
+                    for field in fields
+                }
+                for row in csv.DictReader(f)
+            ]
+    
+    # lookup() returns the first matching row, so keep the first duplicate
+    policies = {}
+    for record in records:
+        policies.setdefault(record["policy_id"], record)
+    return policies
+
 
 class PolicyLookupTool:
     """Tool for looking up policy information."""
     
+    # Fields returned by lookup(), in order
+    POLICY_FIELDS = (
+        "policy_id",
+        "policy_type",
+        "coverage_limit",
+        "deductible",
+        "customer_name",
+        "policy_start_date",
+        "claims_history_count",
+        "is_active",
+    )
+    
     def __init__(self):
-        self.policies_df = self._load_policies()
+        self.policies = self._load_policies()
     
-    def _load_policies(self) -> pd.DataFrame:
-        """Load policies data."""
+    def _load_policies(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load policies data, keyed by policy_id.
+        
+        Every tool shares one parsed table until the file changes, so
+        rebuilding agents does not re-read the file. It must not be mutated.
+        Prefers the generator's Parquet copy when it is up to date.
+        """
         try:
-            return pd.read_csv(config.POLICIES_DATA_PATH)
+            path = str(fresh_parquet_path(config.POLICIES_DATA_PATH) or config.POLICIES_DATA_PATH)
+            return _read_policies(path, os.path.getmtime(path))
         except FileNotFoundError:
-            return pd.DataFrame()
+            return {}
     
     def lookup(self, policy_id: str) -> Dict[str, Any]:
         """
@@ -30,40 +199,45 @@ class PolicyLookupTool:
         Returns:
             Dictionary containing policy information
         """
-        if self.policies_df.empty:
+        if not self.policies:
             return {"error": "Policy database not available"}
         
-        policy = self.policies_df[self.policies_df["policy_id"] == policy_id]
+        policy_dict = self.policies.get(policy_id)
         
-        if policy.empty:
+        if policy_dict is None:
             return {"error": f"Policy {policy_id} not found"}
         
-        policy_dict = policy.iloc[0].to_dict()
+        return dict(policy_dict)
+    
+    def lookup_coverage_limits(self, policy_ids: pd.Series) -> pd.Series:
+        """
+        Look up coverage limits for many policies at once.
         
-        return {
-            "policy_id": policy_dict["policy_id"],
-            "policy_type": policy_dict["policy_type"],
-            "coverage_limit": policy_dict["coverage_limit"],
-            "deductible": policy_dict["deductible"],
-            "customer_name": policy_dict["customer_name"],
-            "policy_start_date": policy_dict["policy_start_date"],
-            "claims_history_count": policy_dict["claims_history_count"],
-            "is_active": policy_dict["is_active"]
-        }
+        Unknown policies map to NaN, like the missing coverage_limit of a
+        failed single lookup.
+        """
+        if not self.policies:
+            return pd.Series(np.nan, index=policy_ids.index)
+        
+        limits = {policy_id: policy["coverage_limit"] for policy_id, policy in self.policies.items()}
+        return policy_ids.map(limits)
 
 
 class RiskScoringTool:
     """Tool for calculating fraud/risk scores."""
     
-    def __init__(self):
-        self.risk_factors = {
-            "high_amount": 0.3,
-            "multiple_claims": 0.25,
-            "new_policy": 0.15,
-            "late_reporting": 0.15,
-            "high_age_risk": 0.10,
-            "location_risk": 0.05
-        }
+    # High-risk locations (simplified)
+    HIGH_RISK_LOCATIONS = frozenset({"New York, NY", "Los Angeles, CA", "Chicago, IL"})
+    
+    # Score added for each risk factor
+    RISK_FACTORS = {
+        "high_amount": 0.3,
+        "multiple_claims": 0.25,
+        "new_policy": 0.15,
+        "late_reporting": 0.15,
+        "high_age_risk": 0.10,
+        "location_risk": 0.05
+    }
     
     def calculate_risk_score(
         self,
@@ -95,22 +269,22 @@ class RiskScoringTool:
         
         # Check high amount (compared to typical claims)
         if claim_amount > 50000:
-            risk_score += self.risk_factors["high_amount"]
+            risk_score += self.RISK_FACTORS["high_amount"]
             risk_factors.append("high_claim_amount")
         
         # Check multiple prior claims
         if prior_claims >= 3:
-            risk_score += self.risk_factors["multiple_claims"]
+            risk_score += self.RISK_FACTORS["multiple_claims"]
             risk_factors.append("multiple_prior_claims")
         
         # Check new policy (less than 1 year)
         if policy_tenure_years < 1:
-            risk_score += self.risk_factors["new_policy"]
+            risk_score += self.RISK_FACTORS["new_policy"]
             risk_factors.append("new_policy")
         
         # Check late reporting (more than 30 days)
         if incident_to_report_days > 30:
-            risk_score += self.risk_factors["late_reporting"]
+            risk_score += self.RISK_FACTORS["late_reporting"]
             risk_factors.append("late_reporting")
         
         # Check if claim amount is close to coverage limit
@@ -121,13 +295,12 @@ class RiskScoringTool:
         # Age-based risk (very young or very old claimants)
         if claimant_age:
             if claimant_age < 25 or claimant_age > 75:
-                risk_score += self.risk_factors["high_age_risk"]
+                risk_score += self.RISK_FACTORS["high_age_risk"]
                 risk_factors.append("age_risk_factor")
         
-        # High-risk locations (simplified)
-        high_risk_locations = ["New York, NY", "Los Angeles, CA", "Chicago, IL"]
-        if location and location in high_risk_locations:
-            risk_score += self.risk_factors["location_risk"]
+        # High-risk locations
+        if location and location in self.HIGH_RISK_LOCATIONS:
+            risk_score += self.RISK_FACTORS["location_risk"]
             risk_factors.append("high_risk_location")
         
         # Normalize to 0-1 scale
@@ -148,6 +321,78 @@ class RiskScoringTool:
             "explanation": self._generate_explanation(risk_level, risk_factors)
         }
     
+    def calculate_risk_score_batch(
+        self,
+        claims_df: pd.DataFrame,
+        coverage_limit: Optional[np.ndarray] = None
+    ) -> pd.DataFrame:
+        """
+        Calculate risk scores and levels for a DataFrame of claims.
+        
+        claims_df needs the calculate_risk_score columns, with
+        incident_to_report_days precomputed; coverage_limit is aligned with
+        its rows (see PolicyLookupTool.lookup_coverage_limits). Returns
+        risk_score and risk_level columns matching calculate_risk_score.
+        """
+        risk_score = self._sum_risk_factors(
+            claims_df["claim_amount"],
+            claims_df["prior_claims"],
+            claims_df["policy_tenure_years"],
+            claims_df["incident_to_report_days"],
+            coverage_limit,
+            claims_df.get("claimant_age"),
+            claims_df.get("location")
+        )
+        
+        # Levels use the unrounded score, as in calculate_risk_score
+        risk_level = np.select(
+            [risk_score >= config.RISK_THRESHOLD_HIGH, risk_score >= config.RISK_THRESHOLD_MEDIUM],
+            ["high", "medium"],
+            default="low"
+        )
+        
+        return pd.DataFrame({
+            "risk_score": np.round(risk_score, 3),
+            "risk_level": risk_level
+        }, index=claims_df.index)
+    
+    def _sum_risk_factors(
+        self,
+        claim_amount: np.ndarray,
+        prior_claims: np.ndarray,
+        policy_tenure_years: np.ndarray,
+        incident_to_report_days: np.ndarray,
+        coverage_limit: Optional[np.ndarray] = None,
+        claimant_age: Optional[np.ndarray] = None,
+        location: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Unrounded vectorized risk scores, capped at 1."""
+        claim_amount = np.asarray(claim_amount, dtype=float)
+        risk_score = np.zeros(len(claim_amount))
+        
+        # Same factors, added in the same order as calculate_risk_score
+        risk_score += np.where(claim_amount > 50000, self.RISK_FACTORS["high_amount"], 0.0)
+        risk_score += np.where(np.asarray(prior_claims) >= 3, self.RISK_FACTORS["multiple_claims"], 0.0)
+        risk_score += np.where(np.asarray(policy_tenure_years) < 1, self.RISK_FACTORS["new_policy"], 0.0)
+        risk_score += np.where(np.asarray(incident_to_report_days) > 30, self.RISK_FACTORS["late_reporting"], 0.0)
+        
+        if coverage_limit is not None:
+            coverage_limit = np.asarray(coverage_limit, dtype=float)
+            near_limit = (coverage_limit != 0) & (claim_amount > coverage_limit * 0.8)
+            risk_score += np.where(near_limit, 0.2, 0.0)
+        
+        if claimant_age is not None:
+            claimant_age = np.asarray(claimant_age, dtype=float)
+            age_risk = (claimant_age != 0) & ((claimant_age < 25) | (claimant_age > 75))
+            risk_score += np.where(age_risk, self.RISK_FACTORS["high_age_risk"], 0.0)
+        
+        if location is not None:
+            high_risk_location = np.isin(np.asarray(location, dtype=object), list(self.HIGH_RISK_LOCATIONS))
+            risk_score += np.where(high_risk_location, self.RISK_FACTORS["location_risk"], 0.0)
+        
+        # Normalize to 0-1 scale
+        return np.minimum(risk_score, 1.0)
+    
     def _generate_explanation(self, risk_level: str, factors: list) -> str:
         """Generate human-readable explanation of risk assessment."""
         if not factors:
@@ -167,8 +412,33 @@ class TriageLoggerTool:
     def _initialize_log(self):
         """Initialize the log file if it doesn't exist."""
         if not self.log_file.exists():
-            with open(self.log_file, 'w') as f:
-                json.dump([], f)
+            self._migrate_legacy_log()
+        self.log_file.touch(exist_ok=True)
+    
+    def _migrate_legacy_log(self):
+        """Convert decisions from the old JSON array log into the JSON lines log."""
+        legacy_file = config.LEGACY_DECISIONS_LOG_PATH
+        try:
+            with open(legacy_file, 'r') as f:
+                log_data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if not log_data:
+            return
+        
+        # Write a temporary file and link it into place, so a concurrent
+        # migration or a decision logged meanwhile is never overwritten
+        temp_file = self.log_file.with_name(f"{self.log_file.name}.{os.getpid()}.tmp")
+        with open(temp_file, 'w') as f:
+            for entry in log_data:
+                f.write(json.dumps(entry, default=str, separators=(",", ":")) + "\n")
+        try:
+            os.link(temp_file, self.log_file)
+            print(f"Converted {len(log_data)} decisions from {legacy_file} to {self.log_file}")
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(temp_file)
     
     def log_decision(
         self,
@@ -197,7 +467,8 @@ class TriageLoggerTool:
         """
         decision_entry = {
             "claim_id": claim_id,
-            "timestamp": datetime.now().isoformat(),
+            # orjson formats datetimes natively, so no isoformat() call here
+            "timestamp": datetime.now(),
             "severity": severity,
             "action": action,
             "rationale": rationale,
@@ -206,19 +477,19 @@ class TriageLoggerTool:
             "metadata": metadata or {}
         }
         
-        # Read existing log
-        try:
-            with open(self.log_file, 'r') as f:
-                log_data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            log_data = []
-        
-        # Append new entry
-        log_data.append(decision_entry)
-        
-        # Write back
-        with open(self.log_file, 'w') as f:
-            json.dump(log_data, f, indent=2)
+        # Append one JSON line; a single write in append mode never
+        # interleaves with concurrent decisions
+        if orjson is not None:
+            line = orjson.dumps(
+                decision_entry,
+                default=str,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+            )
+        else:
+            entry = {**decision_entry, "timestamp": decision_entry["timestamp"].isoformat()}
+            line = (json.dumps(entry, default=str, separators=(",", ":")) + "\n").encode("utf-8")
+        with open(self.log_file, 'ab') as f:
+            f.write(line)
         
         return {
             "status": "logged",
@@ -227,13 +498,14 @@ class TriageLoggerTool:
     
     def get_decision_history(self, claim_id: Optional[str] = None) -> list:
         """Get decision history, optionally filtered by claim ID."""
+        loads = orjson.loads if orjson is not None else json.loads
         try:
-            with open(self.log_file, 'r') as f:
-                log_data = json.load(f)
-            
-            if claim_id:
-                return [entry for entry in log_data if entry["claim_id"] == claim_id]
-            return log_data
-        except (FileNotFoundError, json.JSONDecodeError):
+            with open(self.log_file, 'rb') as f:
+                log_data = [loads(line) for line in f if line.strip()]
+        except (FileNotFoundError, ValueError):
             return []
+        
+        if claim_id:
+            return [entry for entry in log_data if entry["claim_id"] == claim_id]
+        return log_data
 